@@ -1,6 +1,23 @@
-import chainlit as cl
-import asyncio
-from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+from src.knowledge_graph.utils.import_timer import ImportTimer
+
+# Logs how long startup imports took, per package (heavy libraries load later, on first use)
+with ImportTimer("app.py"):
+    import chainlit as cl
+    import asyncio
+    import threading
+    from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+    from src.knowledge_graph.config.configuration import ConfigManager
+    from src.knowledge_graph.logger.metrics import start_metrics_server
+
+# --- 0. Warm-up ---
+# Load the shared models/index/driver in the background as soon as the server starts,
+# so the first chat session does not pay for it.
+threading.Thread(target=RAGPipeline.warm_up, daemon=True).start()
+
+# Prometheus scrape endpoint (FAISS / NER / Neo4j / LLM timings of every chat turn)
+metrics_config = ConfigManager().get_metrics_config()
+if metrics_config.enabled:
+    start_metrics_server(metrics_config.port, metrics_config.host)
 
 # --- 1. Startup ---
 @cl.on_chat_start
@@ -9,8 +26,8 @@ async def start():
     await msg.send()
 
     try:
-        # Load the chain
-        chain = RAGPipeline.get_rag_chain()
+        # Build a per-session chain on top of the shared resources (cheap)
+        chain = await asyncio.to_thread(RAGPipeline.get_rag_chain)
         cl.user_session.set("chain", chain)
         
         msg.content = """
@@ -32,39 +49,33 @@ async def main(message: cl.Message):
         await cl.Message(content="⚠️ Session expired. Please refresh.").send()
         return
 
-    # --- 🟢 VISUAL FEATURE: Dynamic "Thinking" Simulation ---
-    # We create a manual step that stays open while we "load"
+    answer = cl.Message(content="")
+    source_docs = []
+
+    # --- 🟢 VISUAL FEATURE: Live "Reasoning" step ---
+    # The step closes as soon as retrieval is done (sources known), then the
+    # answer streams token by token into the chat message.
     async with cl.Step(name="Reasoning Engine", type="run") as step:
-        
         try:
-            # --- REAL CHAIN EXECUTION ---
-            # We await the real answer now.
-            # Note: We do NOT use callbacks here to keep the UI clean (just the box above).
-            res = await chain.ainvoke(message.content)
-            
-            # --- DATA EXTRACTION ---
-            answer_text = ""
-            source_docs = []
-            
-            # Handle Dict Return (If you updated rag_pipeline.py)
-            if isinstance(res, dict):
-                answer_text = res.get("result") or res.get("output") or str(res)
-                source_docs = res.get("source_documents", [])
-            else:
-                # Fallback if pipeline returns string
-                answer_text = str(res)
-
-            # Update the Step to show success
-            step.output = "✅ Generation Complete"
-
+            events = RAGPipeline.astream_answer(chain, message.content)
+            async for kind, payload in events:
+                if kind == "sources":
+                    source_docs = payload
+                    step.output = f"✅ Retrieved {len(source_docs)} source(s), generating answer..."
+                    break
         except Exception as e:
             step.output = f"❌ Error: {str(e)}"
             await cl.Message(content=f"⚠️ Internal Error: {str(e)}").send()
             return
 
+    # --- 🔵 STREAMED ANSWER ---
+    try:
+        async for kind, token in events:
+            await answer.stream_token(token)
+    except Exception as e:
+        await answer.stream_token(f"\n\n⚠️ Internal Error: {str(e)}")
+
     # --- 🔵 FINAL OUTPUT DISPLAY ---
-    metric_display = ""
-    
     if source_docs:
         metric_display = f"""
         \n\n---
@@ -76,15 +87,11 @@ async def main(message: cl.Message):
         for doc in source_docs[:3]:
             # Safe metadata access
             meta = getattr(doc, 'metadata', {})
-            src = meta.get('source', 'Unknown File').split('/')[-1]
+            src = (meta.get('source') or 'Unknown File').split('/')[-1]
             page = meta.get('page', '1')
             metric_display += f"\n- `{src}` (Pg {page})"
-            
-    elif isinstance(res, str):
-         # If pipeline returns only string, we assume generic confidence
-         pass 
     else:
         metric_display = "\n\n---\n**📊 Confidence:** Low 🔴 (No database context found)"
 
-    # Send final message
-    await cl.Message(content=answer_text + metric_display).send()
\ No newline at end of file
+    await answer.stream_token(metric_display)
+    await answer.send()
@@ -0,0 +1,59 @@
+import sys
+import argparse
+import tempfile
+
+from src.knowledge_graph.benchmark.runner import BenchmarkRunner, compare_reports
+from src.knowledge_graph.utils.common import read_json, write_json
+from src.knowledge_graph.exception.exception import KGException
+
+# Offline benchmark: synthetic corpus through the real pipeline stages, Neo4j and Groq replaced
+# by in-process stand-ins. Exits 1 when --baseline is given and something regressed.
+# Guarded: ingestion workers (spawn/forkserver start methods) re-import this module
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline ingestion/retrieval benchmark")
+    parser.add_argument("--emails", type=int, default=200, help="synthetic email documents")
+    parser.add_argument("--rows", type=int, default=2000, help="rows in the synthetic CSV and SQLite table")
+    parser.add_argument("--queries", type=int, default=100, help="questions timed per retrieval path")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed chain calls before measuring")
+    parser.add_argument("--workers", type=int, default=None, help="ingestion process pool size (default: config)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fake-embedder", action="store_true", help="hashing embedder instead of the model")
+    parser.add_argument("--trace-memory", action="store_true", help="also report tracemalloc peaks (slower)")
+    parser.add_argument("--workdir", default=None, help="workspace for corpus and artifacts (default: temp dir)")
+    parser.add_argument("--output", default="artifacts/benchmark/report.json")
+    parser.add_argument("--baseline", default=None, help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (fraction)")
+    args = parser.parse_args()
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="kg_benchmark_") as tmp:
+            runner = BenchmarkRunner(
+                args.workdir or tmp,
+                num_emails=args.emails,
+                num_rows=args.rows,
+                num_queries=args.queries,
+                warmup=args.warmup,
+                fake_embedder=args.fake_embedder,
+                trace_memory=args.trace_memory,
+                num_workers=args.workers,
+                seed=args.seed
+            )
+            report = runner.run()
+        write_json(args.output, report)
+    except Exception as e:
+        raise KGException(e, sys)
+
+    print("=" * 80)
+    for stage, result in report["stages"].items():
+        print(f"{stage:<22} {result['seconds']:>9.3f}s  {result.get('items_per_second') or 0:>10.1f} items/s  "
+              f"peak RSS {result.get('peak_rss_mb') or 0:.0f} MB")
+    for name, summary in report["latency_ms"].items():
+        print(f"{name:<22} p50 {summary['p50']:>8.2f}ms  p95 {summary['p95']:>8.2f}ms  p99 {summary['p99']:>8.2f}ms")
+    print(f"{'retriever batch':<22} {report['throughput']['retriever_batch_qps']} queries/s")
+    print(f"Report saved to: {args.output}")
+
+    if args.baseline:
+        regressions = compare_reports(report, read_json(args.baseline), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -1,5 +1,5 @@
 import os
-import time  # <--- 1. Import Time
+import asyncio
 import pandas as pd
 from deepeval.metrics import (
     AnswerRelevancyMetric,
@@ -12,6 +12,9 @@ from deepeval.models.base_model import DeepEvalBaseLLM
 from langchain_groq import ChatGroq
 from dotenv import load_dotenv
 
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.components.rate_limiter import TokenBucket, retry_with_backoff, aretry_with_backoff
+from src.knowledge_graph.pipeline.evaluation import EvaluationRunner
 from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
 from test_data import eval_data
 
@@ -19,101 +22,89 @@ load_dotenv()
 
 # --- 1. Custom Model Wrapper ---
 class GroqModel(DeepEvalBaseLLM):
-    def __init__(self, model):
+    """Judge model; every call waits for a rate-limit token and backs off on 429s."""
+    def __init__(self, model, limiter, retry):
         self.model = model
+        self.limiter = limiter
+        self.retry = {"max_retries": retry.max_retries, "base_delay": retry.base_delay, "max_delay": retry.max_delay}
 
     def load_model(self):
         return self.model
 
     def generate(self, prompt: str) -> str:
-        return self.model.invoke(prompt).content
+        return retry_with_backoff(lambda: self.model.invoke(prompt), self.limiter, **self.retry).content
 
     async def a_generate(self, prompt: str) -> str:
-        return self.generate(prompt)
+        response = await aretry_with_backoff(lambda: self.model.ainvoke(prompt), self.limiter, **self.retry)
+        return response.content
 
     def get_model_name(self):
         return "Groq Llama 3.3"
 
 # --- 2. Setup ---
+config = ConfigManager().get_evaluation_config()
+
 groq_judge = ChatGroq(
     model="llama-3.3-70b-versatile",
     api_key=os.getenv("GROQ_API_KEY"),
-    temperature=0
+    temperature=0,
+    max_retries=0  # Retries (with backoff) are done by GroqModel
+)
+judge_limit = config.judge_rate_limit
+groq_evaluator = GroqModel(
+    model=groq_judge,
+    limiter=TokenBucket(judge_limit.requests_per_minute, judge_limit.burst),
+    retry=config.retry
 )
-groq_evaluator = GroqModel(model=groq_judge)
 
 print("Initializing RAG Pipeline...")
-# Call Static Method directly
-chain = RAGPipeline.get_rag_chain()
-
-# Initialize Metrics
-metrics = [
-    AnswerRelevancyMetric(threshold=0.5, model=groq_evaluator),
-    FaithfulnessMetric(threshold=0.5, model=groq_evaluator),
-    ContextualPrecisionMetric(threshold=0.5, model=groq_evaluator),
-    ContextualRecallMetric(threshold=0.5, model=groq_evaluator)
-]
+RAGPipeline.warm_up()
+
+def build_metrics():
+    # Metrics keep the last score on themselves, so each test case gets its own instances
+    return [
+        AnswerRelevancyMetric(threshold=0.5, model=groq_evaluator),
+        FaithfulnessMetric(threshold=0.5, model=groq_evaluator),
+        ContextualPrecisionMetric(threshold=0.5, model=groq_evaluator),
+        ContextualRecallMetric(threshold=0.5, model=groq_evaluator)
+    ]
+
+async def score(question, answer, expected, contexts):
+    test_case = LLMTestCase(
+        input=question,
+        actual_output=answer,
+        expected_output=expected,
+        retrieval_context=contexts
+    )
+    # The four metrics run concurrently; the judge's token bucket does the pacing
+    metrics = build_metrics()
+    await asyncio.gather(*(metric.a_measure(test_case) for metric in metrics))
+
+    row_result = {}
+    lines = [f"\nEvaluated: {question[:60]}..."]
+    for metric in metrics:
+        name = metric.__class__.__name__
+        row_result[name] = metric.score
+        row_result[f"{name}_pass"] = metric.is_successful()
+        lines.append(f"  {name}: {metric.score:.2f} {'✓' if metric.is_successful() else '✗'}")
+    print("\n".join(lines))
+    return row_result
 
 print("="*80)
 print("DEEPEVAL RAG EVALUATION (With Rate Limiting)")
 print("="*80)
 
-results = []
-
-# --- 3. Evaluation Loop ---
-for i, item in enumerate(eval_data, 1):
-    try:
-        print(f"\n[{i}/{len(eval_data)}] Evaluating: {item['question'][:60]}...")
-        
-        # A. RAG Generation
-        response = chain.invoke(item["question"])
-        
-        # B. Context Retrieval
-        retriever_out = chain.steps[0].invoke(item["question"])
-        raw_docs = retriever_out["context"] 
-        contexts = [doc.page_content for doc in raw_docs]
-
-        # C. Create Test Case
-        test_case = LLMTestCase(
-            input=item["question"],
-            actual_output=response,
-            expected_output=item["ground_truth"],
-            retrieval_context=contexts
-        )
-
-        row_result = {
-            "question": item["question"],
-            "answer": response,
-            "expected": item["ground_truth"]
-        }
-        
-        # D. Measure Metrics (With Delays)
-        for metric in metrics:
-            metric.measure(test_case)
-            print(f"  {metric.__class__.__name__}: {metric.score:.2f} {'✓' if metric.is_successful() else '✗'}")
-            
-            # Save score
-            name = metric.__class__.__name__
-            row_result[name] = metric.score
-            row_result[f"{name}_pass"] = metric.is_successful()
-            
-            # 2. Small Delay between each metric check (Prevents burst limit)
-            time.sleep(1) 
-
-        results.append(row_result)
-        
-        # 3. Major Delay between questions (Refills your RPM bucket)
-        print("Cooling down for 3 seconds...")
-        time.sleep(3)
-
-    except Exception as e:
-        print(f"Error evaluating question {i}: {e}")
-        time.sleep(5) # Wait longer if we hit an error
+# --- 3. Generation + Evaluation ---
+# Answers/contexts and scores are cached per question, so an interrupted run resumes
+print(f"Evaluating {len(eval_data)} questions (up to {config.max_concurrency} at a time)...")
+results = EvaluationRunner(config, score).run(eval_data)
 
 # --- 4. Save & Summary ---
 if results:
-    df = pd.DataFrame(results)
-    df.to_csv("deepeval_results.csv", index=False)
-    print("\nResults saved to: deepeval_results.csv")
+    df = pd.DataFrame(results).drop(columns=["key"])
+    df.to_csv(config.output_csv, index=False)
+    print(f"\nResults saved to: {config.output_csv}")
+    if len(results) < len(eval_data):
+        print(f"{len(eval_data) - len(results)} question(s) failed; rerun to retry only those.")
 else:
-    print("No results generated.")
\ No newline at end of file
+    print("No results generated.")
@@ -1,36 +1,56 @@
-from src.knowledge_graph.logger.logging import logger
-from src.knowledge_graph.exception.exception import KGException
-from src.knowledge_graph.pipeline.stage_1 import DataIngestionTrainingPipeline
-from src.knowledge_graph.pipeline.stage_2 import DataTransformationTrainingPipeline
-from src.knowledge_graph.pipeline.stage_3 import DataEmbeddingPipeline
-import sys
-
-STAGE_NAME = "Data Ingestion"
-
-try:
-    logger.info("Initiailizing Data Ingestion Pipeline")
-    obj = DataIngestionTrainingPipeline()
-    obj.initiate_data_ingestion()
-    logger.info("Completed Data Ingestion Pipeline")
-except Exception as e:
-    raise KGException(e,sys)
-
-STAGE_NAME = " Data Transformation"
-
-try:
-    logger.info("Initializing Data Transformation Pipeline")
-    obj = DataTransformationTrainingPipeline()
-    obj.initiate_data_transformation()
-    logger.info("Completed Data Transformation Pipeline")
-except Exception as e:
-    raise KGException(e,sys)
-
-STAGE_NAME ="Data Embedding"
-
-try:
-    logger.info("Inititalizing Data Embedding")
-    obj = DataEmbeddingPipeline()
-    obj.initiate_data_embedding()
-    logger.info("Completed Data Embedding")
-except Exception as e:
-    raise KGException(e,sys)
+from src.knowledge_graph.utils.import_timer import ImportTimer
+
+# Guarded: ingestion workers (spawn/forkserver start methods) re-import this module
+if __name__ == "__main__":
+    # Logs how long startup imports took, per package
+    with ImportTimer("main.py"):
+        from src.knowledge_graph.logger.logging import logger
+        from src.knowledge_graph.exception.exception import KGException
+        from src.knowledge_graph.pipeline.stage_1 import DataIngestionTrainingPipeline
+        from src.knowledge_graph.pipeline.stage_2 import DataTransformationTrainingPipeline
+        from src.knowledge_graph.pipeline.stage_3 import DataEmbeddingPipeline
+        from src.knowledge_graph.config.configuration import ConfigManager
+        from src.knowledge_graph.logger.metrics import metrics, span
+        from src.knowledge_graph.utils.common import write_json
+        import sys
+
+    STAGE_NAME = "Data Ingestion"
+
+    try:
+        logger.info("Initiailizing Data Ingestion Pipeline")
+        obj = DataIngestionTrainingPipeline()
+        with span("pipeline.stage", stage=STAGE_NAME.strip()):
+            obj.initiate_data_ingestion()
+        logger.info("Completed Data Ingestion Pipeline")
+    except Exception as e:
+        raise KGException(e,sys)
+
+    STAGE_NAME = " Data Transformation"
+
+    try:
+        logger.info("Initializing Data Transformation Pipeline")
+        obj = DataTransformationTrainingPipeline()
+        with span("pipeline.stage", stage=STAGE_NAME.strip()):
+            obj.initiate_data_transformation()
+        logger.info("Completed Data Transformation Pipeline")
+    except Exception as e:
+        raise KGException(e,sys)
+
+    STAGE_NAME ="Data Embedding"
+
+    try:
+        logger.info("Inititalizing Data Embedding")
+        obj = DataEmbeddingPipeline()
+        with span("pipeline.stage", stage=STAGE_NAME.strip()):
+            obj.initiate_data_embedding()
+        logger.info("Completed Data Embedding")
+    except Exception as e:
+        raise KGException(e,sys)
+
+    # Per-stage and per-step timings (counts, totals, p50/p95/p99) of this run
+    try:
+        report_path = ConfigManager().get_metrics_config().report_path
+        write_json(report_path, metrics.report())
+        logger.info(f"Pipeline metrics report saved to {report_path}")
+    except Exception as e:
+        raise KGException(e,sys)
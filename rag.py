@@ -1,7 +1,11 @@
-from src.knowledge_graph.logger.logging import logger
-from src.knowledge_graph.exception.exception import KGException
-from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
-import sys
+from src.knowledge_graph.utils.import_timer import ImportTimer
+
+# Logs how long startup imports took, per package (heavy libraries load later, on first use)
+with ImportTimer("rag.py"):
+    from src.knowledge_graph.logger.logging import logger
+    from src.knowledge_graph.exception.exception import KGException
+    from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+    import sys
 
 try:
     logger.info("Initializing RAG Pipeline")
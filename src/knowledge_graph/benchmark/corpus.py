@@ -0,0 +1,98 @@
+import os
+import csv
+import random
+import sqlite3
+
+# Small closed vocabularies: names spaCy tags as PERSON/ORG/GPE, recombined at random
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Emma", "Frank", "Grace", "Henry", "Isabel", "James",
+               "Karen", "Liam", "Maria", "Noah", "Olivia", "Peter", "Rachel", "Samuel", "Tina", "Victor"]
+LAST_NAMES = ["Johnson", "Smith", "Williams", "Brown", "Garcia", "Miller", "Davis", "Martinez",
+              "Anderson", "Taylor", "Thomas", "Moore", "Jackson", "Martin", "Lee", "Walker"]
+COMPANIES = ["Acme Corporation", "Globex Inc", "Initech", "Umbrella Corporation", "Stark Industries",
+             "Wayne Enterprises", "Hooli", "Vandelay Industries", "Soylent Corp", "Cyberdyne Systems",
+             "Wonka Industries", "Tyrell Corporation"]
+CITIES = ["Berlin", "London", "Paris", "Madrid", "Chicago", "Toronto", "Sydney", "Tokyo",
+          "Mumbai", "Boston", "Dublin", "Singapore"]
+COUNTRIES = ["Germany", "United Kingdom", "France", "Spain", "United States", "Canada",
+             "Australia", "Japan", "India", "Ireland", "Singapore"]
+PRODUCTS = ["analytics platform", "billing service", "cloud storage plan", "support contract",
+            "data warehouse", "mobile app", "security audit", "payment gateway"]
+
+SENTENCES = [
+    "{person} from {company} met {person2} in {city} to discuss the {product}.",
+    "{company} signed a new {product} agreement with {company2} last week.",
+    "{person} will travel to {city} on Monday to present the {product} to {company}.",
+    "The {product} rollout at {company} is led by {person} and reviewed by {person2}.",
+    "{person2} asked {person} whether {company} can deliver the {product} before the {city} launch.",
+    "{company2} expanded its office in {city}, {country} and hired {person} as regional lead.",
+]
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _sentence(rng):
+    return rng.choice(SENTENCES).format(
+        person=_person(rng), person2=_person(rng),
+        company=rng.choice(COMPANIES), company2=rng.choice(COMPANIES),
+        city=rng.choice(CITIES), country=rng.choice(COUNTRIES), product=rng.choice(PRODUCTS),
+    )
+
+
+def generate_corpus(data_dir, num_emails=200, num_rows=2000, sentences_per_email=8, seed=0):
+    """
+    Writes a synthetic corpus in the layout DataIngestion reads:
+    emails/*.txt, pdf/ (left empty), spreadsheets/customers.csv and sql/benchmark.db.
+    The same seed always produces the same corpus.
+    """
+    rng = random.Random(seed)
+    email_dir = os.path.join(data_dir, "emails")
+    pdf_dir = os.path.join(data_dir, "pdf")
+    csv_dir = os.path.join(data_dir, "spreadsheets")
+    sql_dir = os.path.join(data_dir, "sql")
+    for path in (email_dir, pdf_dir, csv_dir, sql_dir):
+        os.makedirs(path, exist_ok=True)
+
+    for i in range(num_emails):
+        body = " ".join(_sentence(rng) for _ in range(sentences_per_email))
+        with open(os.path.join(email_dir, f"email{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"From: {_person(rng)}\nTo: {_person(rng)}\nDate: 2024-01-{i % 28 + 1:02d}\n"
+                    f"Subject: {rng.choice(PRODUCTS).title()} update\n\n{body}\n")
+
+    rows = [
+        (i, _person(rng), rng.choice(COMPANIES), rng.choice(CITIES), rng.choice(COUNTRIES), rng.choice(PRODUCTS))
+        for i in range(num_rows)
+    ]
+    columns = ["Customer Id", "Name", "Company", "City", "Country", "Product"]
+    with open(os.path.join(csv_dir, "customers.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+    db_path = os.path.join(sql_dir, "benchmark.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, company TEXT, "
+                     "city TEXT, country TEXT, product TEXT)")
+        conn.executemany("INSERT INTO customers VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    return {"email_dir": email_dir, "pdf_dir": pdf_dir, "csv_dir": csv_dir, "db_path": db_path}
+
+
+def sample_queries(n, seed=0):
+    """Chat-style questions over the same vocabulary, so both retrieval branches get hits."""
+    rng = random.Random(seed + 1)
+    templates = [
+        "Who did {person} meet in {city}?",
+        "What is the status of the {product} at {company}?",
+        "Which companies work with {company}?",
+        "Who leads the {product} rollout at {company}?",
+        "What happened in {city} last week?",
+    ]
+    return [
+        rng.choice(templates).format(person=_person(rng), city=rng.choice(CITIES),
+                                     product=rng.choice(PRODUCTS), company=rng.choice(COMPANIES))
+        for _ in range(n)
+    ]
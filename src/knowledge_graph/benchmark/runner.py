@@ -0,0 +1,235 @@
+import os
+import sys
+import time
+import asyncio
+import platform
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from unittest import mock
+
+import yaml
+import numpy as np
+
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.constants import CONFIG_FILE_PATH
+from src.knowledge_graph.components import data_transformation, data_embedding
+from src.knowledge_graph.components.data_ingestion import DataIngestion
+from src.knowledge_graph.components.data_transformation import DataTransformation
+from src.knowledge_graph.components.data_embedding import DataEmbedding
+from src.knowledge_graph.pipeline.resources import registry
+from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+from src.knowledge_graph.benchmark.corpus import generate_corpus, sample_queries
+from src.knowledge_graph.benchmark.stand_ins import (InMemoryGraph, InMemoryDriver, InMemoryAsyncDriver,
+                                                     GraphDatabaseStandIn, HashingEmbedder, fake_llm)
+from src.knowledge_graph.utils.common import read_jsonl
+from src.knowledge_graph.logger.logging import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PERCENTILES = (50, 95, 99)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def latency_summary(seconds):
+    """p50/p95/p99/mean/max in milliseconds."""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    if ms.size == 0:
+        return {}
+    summary = {f"p{p}": round(float(np.percentile(ms, p)), 3) for p in PERCENTILES}
+    summary.update(mean=round(float(ms.mean()), 3), max=round(float(ms.max()), 3), n=int(ms.size))
+    return summary
+
+
+def _workspace_paths(node, workdir):
+    # Repo-relative artifacts/ and data/ paths are moved under the workspace
+    if isinstance(node, dict):
+        return {k: _workspace_paths(v, workdir) for k, v in node.items()}
+    if isinstance(node, list):
+        return [_workspace_paths(v, workdir) for v in node]
+    if isinstance(node, str) and (node == "artifacts" or node.startswith(("artifacts/", "data/"))):
+        return os.path.join(workdir, node)
+    return node
+
+
+class BenchmarkRunner:
+    """
+    Offline benchmark: synthetic corpus -> DataIngestion -> DataTransformation -> DataEmbedding,
+    then retriever and chain latency. Neo4j is an InMemoryGraph and ChatGroq a fixed-answer
+    fake, so nothing touches the network (unless the real embedding model must be downloaded).
+    """
+
+    def __init__(self, workdir, num_emails=200, num_rows=2000, num_queries=100, warmup=5,
+                 fake_embedder=False, trace_memory=False, num_workers=None, seed=0):
+        self.workdir = os.path.abspath(workdir)
+        self.num_emails = num_emails
+        self.num_rows = num_rows
+        self.num_queries = num_queries
+        self.warmup = warmup
+        self.fake_embedder = fake_embedder
+        self.trace_memory = trace_memory
+        self.num_workers = num_workers
+        self.seed = seed
+
+        self.graph = InMemoryGraph()
+        self.report = {"stages": {}, "latency_ms": {}, "throughput": {}}
+
+    def _write_config(self):
+        """A copy of config.yaml with every artifact/data path inside the workspace."""
+        with open(CONFIG_FILE_PATH) as f:
+            config = _workspace_paths(yaml.safe_load(f), self.workdir)
+        config["data_ingestion"]["db_path"] = os.path.join(self.workdir, "data", "sql", "benchmark.db")
+        if self.num_workers is not None:
+            config["data_ingestion"]["parallel"]["num_workers"] = self.num_workers
+        # Every run is a clean full build, never a delta against an earlier run
+        for section in ("data_ingestion", "data_transformation", "embedding_pipeline"):
+            config[section]["incremental"] = False
+        config["embedding_pipeline"]["embedding_cache"]["enabled"] = False
+
+        path = os.path.join(self.workdir, "config.yaml")
+        with open(path, "w") as f:
+            yaml.safe_dump(config, f, sort_keys=False)
+        return ConfigManager(Path(path))
+
+    @contextmanager
+    def _measure(self, stage):
+        """Wall time, peak RSS (and traced Python peak with trace_memory) of one stage."""
+        result = {}
+        rss_before = _peak_rss_mb()
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            seconds = time.perf_counter() - start
+            if self.trace_memory:
+                result["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                tracemalloc.stop()
+            rss_after = _peak_rss_mb()
+            result["seconds"] = round(seconds, 4)
+            if "items" in result:
+                result["items_per_second"] = round(result["items"] / seconds, 2) if seconds else None
+            if rss_after is not None:
+                result["peak_rss_mb"] = round(rss_after, 2)
+                result["peak_rss_growth_mb"] = round(rss_after - rss_before, 2)
+            self.report["stages"][stage] = result
+            logger.info(f"Benchmark stage {stage}: {result}")
+
+    # 1️⃣ Pipeline stages
+    def run_ingestion(self, config):
+        cfg = config.get_data_ingestion_config()
+        with self._measure("data_ingestion") as result:
+            DataIngestion(cfg).ingest()
+            result["items"] = sum(1 for _ in read_jsonl(cfg.output_records))
+
+    def run_transformation(self, config):
+        cfg = config.get_data_transformation_config()
+        with mock.patch.object(data_transformation, "GraphDatabase", GraphDatabaseStandIn(self.graph)):
+            with self._measure("data_transformation") as result:
+                transformation = DataTransformation(cfg)
+                transformation.extract_entities_and_relationships()
+                transformation.create_triples()
+                transformation.build_graph()
+                result.update(items=len(transformation.processed_doc_ids),
+                              entities=len(transformation.entities), triples=len(transformation.triples))
+
+    def run_embedding(self, config):
+        cfg = config.get_embedding_pipeline_config()
+        patch = mock.patch.object(data_embedding, "SentenceTransformer", HashingEmbedder) \
+            if self.fake_embedder else nullcontext()
+        with patch, self._measure("data_embedding") as result:
+            embedding = DataEmbedding(cfg)
+            embedding.build_vector_store()
+            result["items"] = embedding.chunk_count
+
+    # 2️⃣ Retrieval and chain latency
+    @staticmethod
+    def _timed(fn, inputs):
+        seconds = []
+        for item in inputs:
+            start = time.perf_counter()
+            fn(item)
+            seconds.append(time.perf_counter() - start)
+        return seconds
+
+    @staticmethod
+    async def _atimed(fn, inputs):
+        seconds = []
+        for item in inputs:
+            start = time.perf_counter()
+            await fn(item)
+            seconds.append(time.perf_counter() - start)
+        return seconds
+
+    def run_retrieval(self, config):
+        rag_config = config.get_rag_pipeline_config()
+        # Every question must run the full chain, not come back from the answer cache
+        rag_config.answer_cache.enabled = False
+        overrides = dict(config=rag_config, graph=InMemoryDriver(self.graph),
+                         async_graph=InMemoryAsyncDriver(self.graph), llm=fake_llm())
+        if self.fake_embedder:
+            overrides["embedder"] = HashingEmbedder()
+        registry.override(**overrides)
+        # Repeated benchmark questions must pay for their query encode, not hit the memo
+        registry.override(query_embedder=registry.embedder)
+        registry.warm_up()
+
+        retriever = RAGPipeline.build_retriever()
+        chain = RAGPipeline.get_rag_chain()
+        queries = sample_queries(self.num_queries, self.seed)
+        for query in queries[:self.warmup]:
+            chain.invoke(query)
+
+        latency = self.report["latency_ms"]
+        latency["retriever"] = latency_summary(self._timed(retriever.invoke, queries))
+        latency["retriever_async"] = latency_summary(asyncio.run(self._atimed(retriever.ainvoke, queries)))
+        latency["chain"] = latency_summary(self._timed(chain.invoke, queries))
+
+        start = time.perf_counter()
+        retriever.batch(queries)
+        seconds = time.perf_counter() - start
+        self.report["throughput"]["retriever_batch_qps"] = round(len(queries) / seconds, 2) if seconds else None
+
+    def run(self):
+        os.makedirs(self.workdir, exist_ok=True)
+        corpus = generate_corpus(os.path.join(self.workdir, "data"), self.num_emails, self.num_rows, seed=self.seed)
+        self.report["corpus"] = {"emails": self.num_emails, "rows": self.num_rows, "queries": self.num_queries,
+                                 "seed": self.seed, **corpus}
+        self.report["environment"] = {"python": platform.python_version(), "platform": platform.platform(),
+                                      "fake_embedder": self.fake_embedder, "trace_memory": self.trace_memory}
+
+        config = self._write_config()
+        self.run_ingestion(config)
+        self.run_transformation(config)
+        self.run_embedding(config)
+        self.report["graph"] = {"nodes": len(self.graph.nodes), "edges": len(self.graph.edges)}
+        self.run_retrieval(config)
+        return self.report
+
+
+def compare_reports(report, baseline, tolerance=0.25):
+    """
+    Regressions of `report` against `baseline`: stages whose wall time and latencies whose
+    p95 grew by more than `tolerance` (a fraction). Returns human-readable lines.
+    """
+    regressions = []
+    for stage, result in report.get("stages", {}).items():
+        before = baseline.get("stages", {}).get(stage, {}).get("seconds")
+        if before and result["seconds"] > before * (1 + tolerance):
+            regressions.append(f"{stage}: {before:.3f}s -> {result['seconds']:.3f}s")
+    for name, summary in report.get("latency_ms", {}).items():
+        before = baseline.get("latency_ms", {}).get(name, {}).get("p95")
+        if before and summary.get("p95", 0) > before * (1 + tolerance):
+            regressions.append(f"{name} p95: {before:.1f}ms -> {summary['p95']:.1f}ms")
+    return regressions
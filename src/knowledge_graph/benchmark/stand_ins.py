@@ -0,0 +1,317 @@
+import re
+import zlib
+import bisect
+import threading
+
+import numpy as np
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.knowledge_graph.components.graph_schema import SCHEMA_STATEMENTS
+from src.knowledge_graph.components.graph_loader import (ENTITY_QUERY, RELATIONSHIP_QUERY, REPLACE_DOCS,
+                                                          UPSERT_DOCS, RETRACT_RELATIONSHIP_QUERY,
+                                                          RETRACT_ENTITY_QUERY, GARBAGE_QUERIES)
+from src.knowledge_graph.components.data_retriever import ENTITY_CYPHER
+
+_REL_TYPE = re.compile(r"\[r:(\w+)\]")
+
+
+def _tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+class InMemoryGraph:
+    """
+    In-process stand-in for the Neo4j database behind the graph loader and the retriever.
+
+    It does not parse Cypher: it only understands the repo's own queries (matched exactly
+    against the constants in graph_loader, graph_schema and data_retriever) and raises on
+    anything else, so a changed query fails the benchmark instead of silently doing nothing.
+    The full-text lookup is a token/prefix match, not Lucene, so graph latencies measure
+    the retriever's overhead rather than Neo4j's.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.nodes = {}        # id -> {"name", "type", "doc_ids"}
+        self.edges = {}        # (head_id, rel_type, tail_id) -> {"doc_ids", "doc_weights", "weight"}
+        self.adjacency = {}    # id -> set of edge keys touching it
+        self.postings = {}     # name token -> set of node ids
+        self._vocab = None     # sorted tokens for prefix lookups, rebuilt after writes
+
+    # --- Writes ---
+    def _index_node(self, node_id, name):
+        for token in _tokens(name):
+            self.postings.setdefault(token, set()).add(node_id)
+        self._vocab = None
+
+    def _delete_edge(self, key):
+        self.edges.pop(key, None)
+        for node_id in (key[0], key[2]):
+            self.adjacency.get(node_id, set()).discard(key)
+
+    def _delete_node(self, node_id):
+        node = self.nodes.pop(node_id)
+        for key in list(self.adjacency.pop(node_id, ())):
+            self._delete_edge(key)
+        for token in _tokens(node["name"]):
+            self.postings.get(token, set()).discard(node_id)
+
+    def merge_entities(self, batch):
+        for row in batch:
+            node = self.nodes.get(row["id"])
+            if node is None:
+                node = self.nodes[row["id"]] = {"name": row["name"], "type": row["label"], "doc_ids": []}
+                self._index_node(row["id"], row["name"])
+            node["name"], node["type"] = row["name"], row["label"]
+            node["doc_ids"] += [d for d in row["doc_ids"] if d not in node["doc_ids"]]
+
+    @staticmethod
+    def _set_edge_docs(edge, kept, doc_ids=(), doc_weights=()):
+        # Mirrors the Cypher: entries at the kept positions, then the new ones, weight is their sum
+        edge["doc_weights"] = [edge["doc_weights"][i] if i < len(edge["doc_weights"]) else 1 for i in kept] \
+            + list(doc_weights)
+        edge["doc_ids"] = [edge["doc_ids"][i] for i in kept] + list(doc_ids)
+        edge["weight"] = sum(edge["doc_weights"])
+
+    def merge_relationships(self, rel_type, batch, replace_weights):
+        for row in batch:
+            if row["head_id"] not in self.nodes or row["tail_id"] not in self.nodes:
+                continue
+            key = (row["head_id"], rel_type, row["tail_id"])
+            edge = self.edges.get(key)
+            if edge is None:
+                edge = self.edges[key] = {"doc_ids": [], "doc_weights": [], "weight": 0}
+                self.adjacency.setdefault(key[0], set()).add(key)
+                self.adjacency.setdefault(key[2], set()).add(key)
+            kept = [] if replace_weights else \
+                [i for i, d in enumerate(edge["doc_ids"]) if d not in row["doc_ids"]]
+            self._set_edge_docs(edge, kept, row["doc_ids"], row["doc_weights"])
+
+    def retract_relationships(self, rel_type, batch):
+        for row in batch:
+            key = (row["head_id"], rel_type, row["tail_id"])
+            edge = self.edges.get(key)
+            if edge is None:
+                continue
+            self._set_edge_docs(edge, [i for i, d in enumerate(edge["doc_ids"]) if d not in row["doc_ids"]])
+            if not edge["doc_ids"]:
+                self._delete_edge(key)
+
+    def retract_entities(self, batch):
+        for row in batch:
+            node = self.nodes.get(row["id"])
+            if node is None:
+                continue
+            node["doc_ids"] = [d for d in node["doc_ids"] if d not in row["doc_ids"]]
+            if not node["doc_ids"]:
+                self._delete_node(row["id"])
+
+    def collect_garbage(self, nodes):
+        if nodes:
+            for node_id in [n for n, node in self.nodes.items() if not node["doc_ids"]]:
+                self._delete_node(node_id)
+        else:
+            for key in [k for k, edge in self.edges.items() if not edge["doc_ids"]]:
+                self._delete_edge(key)
+
+    # --- Reads ---
+    def _matching_nodes(self, token):
+        # Exact or prefix match, like (t OR t*) in entity_search_query
+        if self._vocab is None:
+            self._vocab = sorted(t for t, ids in self.postings.items() if ids)
+        start = bisect.bisect_left(self._vocab, token)
+        matched = set()
+        for vocab_token in self._vocab[start:]:
+            if not vocab_token.startswith(token):
+                break
+            matched |= self.postings[vocab_token]
+        return matched
+
+    def search_entities(self, lookups, limit):
+        """Rows shaped like ENTITY_CYPHER's: every token must match; exact phrases rank highest."""
+        records = []
+        for lookup in lookups:
+            tokens = _tokens(lookup["entity"])
+            if not tokens:
+                continue
+            candidates = set.intersection(*(self._matching_nodes(t) for t in tokens))
+            phrase = " ".join(tokens)
+            scored = sorted(
+                ((3.0 if phrase in " ".join(_tokens(self.nodes[n]["name"])) else 1.0, n) for n in candidates),
+                key=lambda item: (-item[0], item[1])
+            )[:limit]
+
+            facts = []
+            for score, node_id in scored:
+                for head, rel, tail in sorted(self.adjacency.get(node_id, ())):
+                    facts.append({"entity": lookup["entity"], "edge_id": f"{head}|{rel}|{tail}",
+                                  "source": self.nodes[head]["name"], "rel": rel,
+                                  "target": self.nodes[tail]["name"], "score": score})
+            records.extend(facts[:limit])
+        return records
+
+    # --- Query dispatch ---
+    def run(self, query, parameters=None, **kwargs):
+        params = {**(parameters or {}), **kwargs}
+        with self._lock:
+            if query in SCHEMA_STATEMENTS:
+                return []
+            if query == ENTITY_QUERY:
+                self.merge_entities(params["batch"])
+                return []
+            if query == RETRACT_ENTITY_QUERY:
+                self.retract_entities(params["batch"])
+                return []
+            if query in GARBAGE_QUERIES:
+                self.collect_garbage(nodes=query == GARBAGE_QUERIES[1])
+                return []
+            if query == ENTITY_CYPHER:
+                return self.search_entities(params["lookups"], params["limit"])
+
+            match = _REL_TYPE.search(query)
+            if match:
+                rel_type = match.group(1)
+                template = RELATIONSHIP_QUERY.replace("{rel_type}", rel_type)
+                if query == template.replace("{kept}", REPLACE_DOCS):
+                    self.merge_relationships(rel_type, params["batch"], replace_weights=True)
+                    return []
+                if query == template.replace("{kept}", UPSERT_DOCS):
+                    self.merge_relationships(rel_type, params["batch"], replace_weights=False)
+                    return []
+                if query == RETRACT_RELATIONSHIP_QUERY.replace("{rel_type}", rel_type):
+                    self.retract_relationships(rel_type, params["batch"])
+                    return []
+        raise NotImplementedError(f"InMemoryGraph does not understand this query:\n{query}")
+
+
+class _Result(list):
+    """Records of one query; also answers consume() like neo4j.Result."""
+
+    def consume(self):
+        return None
+
+
+class _Transaction:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def run(self, query, parameters=None, **kwargs):
+        return _Result(self.graph.run(query, parameters, **kwargs))
+
+
+class _Session(_Transaction):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, work, *args, **kwargs):
+        return work(_Transaction(self.graph), *args, **kwargs)
+
+    execute_read = execute_write
+
+    def close(self):
+        pass
+
+
+class InMemoryDriver:
+    """The subset of neo4j.Driver used by GraphLoader and HybridRetriever."""
+
+    def __init__(self, graph=None):
+        self.graph = graph if graph is not None else InMemoryGraph()
+
+    def session(self, **kwargs):
+        return _Session(self.graph)
+
+    def close(self):
+        pass
+
+
+class _AsyncResult:
+    def __init__(self, records):
+        self.records = records
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for record in self.records:
+            yield record
+
+    async def consume(self):
+        return None
+
+
+class _AsyncSession:
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, parameters=None, **kwargs):
+        return _AsyncResult(self.graph.run(query, parameters, **kwargs))
+
+
+class InMemoryAsyncDriver:
+    """The subset of neo4j.AsyncDriver used by HybridRetriever, over the same graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def session(self, **kwargs):
+        return _AsyncSession(self.graph)
+
+    async def close(self):
+        pass
+
+
+class GraphDatabaseStandIn:
+    """Drop-in for neo4j.GraphDatabase: every driver it hands out shares one InMemoryGraph."""
+
+    def __init__(self, graph=None):
+        self.graph = graph if graph is not None else InMemoryGraph()
+
+    def driver(self, uri=None, **kwargs):
+        return InMemoryDriver(self.graph)
+
+
+class HashingEmbedder:
+    """
+    Deterministic, model-free stand-in for SentenceTransformer (hashed unigrams and bigrams
+    with random signs). Vectors are meaningless semantically but stable across runs, so
+    index and search costs can be benchmarked without downloading or running a model.
+    """
+
+    def __init__(self, model_name_or_path=None, device=None, dim=384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = _tokens(text)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return vector
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False, convert_to_numpy=True,
+               normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.stack([self._embed(t) for t in texts]) if texts else np.zeros((0, self.dim), dtype=np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors[0] if single else vectors
+
+
+def fake_llm(answer="According to my database, this is a deterministic benchmark answer."):
+    """ChatGroq stand-in: always returns the same answer (and streams it character by character)."""
+    return FakeListChatModel(responses=[answer])
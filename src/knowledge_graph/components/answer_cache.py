@@ -0,0 +1,231 @@
+import os
+import copy
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+from langchain_core.runnables import Runnable
+
+from src.knowledge_graph.logger.logging import logger
+
+
+def file_version(*paths):
+    """Cheap change marker for a set of files: (mtime_ns, size) per path, None when missing."""
+    version = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            version.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+class QueryEmbeddingMemo:
+    """
+    Wraps the query embedder and remembers the last `max_entries` question vectors, so
+    the answer cache and the retriever share one encode per question: the cache embeds
+    the question for its lookup, and on a miss the retriever's encode is a memo hit.
+    """
+
+    def __init__(self, embedder, max_entries=256):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._vectors = OrderedDict()   # (text, normalized) -> vector, least recently used first
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        with self._lock:
+            rows = [self._vectors.get((text, normalize_embeddings)) for text in texts]
+        missing = list(dict.fromkeys(text for text, row in zip(texts, rows) if row is None))
+        if missing:
+            new = np.asarray(self.embedder.encode(missing, normalize_embeddings=normalize_embeddings, **kwargs),
+                             dtype=np.float32)
+            encoded = dict(zip(missing, new))
+            rows = [encoded[text] if row is None else row for text, row in zip(texts, rows)]
+
+        with self._lock:
+            for text, row in zip(texts, rows):
+                self._vectors[(text, normalize_embeddings)] = row
+                self._vectors.move_to_end((text, normalize_embeddings))
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return np.stack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+
+class SemanticAnswerCache:
+    """
+    Process-wide cache of chain outputs keyed by question embedding.
+
+    A question hits when its normalized embedding is within `similarity_threshold`
+    (cosine) of a cached one. Cached questions live in a small exact inner-product
+    FAISS index; entries expire after `ttl_seconds`, the least recently used ones
+    are evicted beyond `max_entries`, and everything is dropped when `version_fn()`
+    changes (new vector index or graph build).
+    """
+
+    def __init__(self, embedder, similarity_threshold=0.95, ttl_seconds=3600, max_entries=1000, version_fn=None):
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version_fn = version_fn or (lambda: None)
+
+        self._lock = threading.Lock()
+        self._index = None
+        self._entries = OrderedDict()   # id -> (question, response, stored_at), oldest first
+        self._next_id = 0
+        self._version = self.version_fn()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def embed(self, question):
+        return np.asarray(self.embedder.encode([question], normalize_embeddings=True), dtype=np.float32)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self._index = None
+        self._entries.clear()
+
+    def _check_version(self):
+        version = self.version_fn()
+        if version != self._version:
+            if self._entries:
+                logger.info(f"Index/graph version changed, dropping {len(self._entries)} cached answers")
+            self._clear()
+            self._version = version
+
+    def _remove(self, ids):
+        for entry_id in ids:
+            self._entries.pop(entry_id, None)
+        self._index.remove_ids(np.asarray(ids, dtype=np.int64))
+
+    def lookup(self, vector):
+        """Returns the cached response for an embedded question, or None."""
+        with self._lock:
+            self._check_version()
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            scores, ids = self._index.search(vector, 1)
+            entry_id, score = int(ids[0][0]), float(scores[0][0])
+            if entry_id < 0 or score < self.similarity_threshold:
+                self.misses += 1
+                return None
+
+            question, response, stored_at = self._entries[entry_id]
+            if self.ttl_seconds and time.time() - stored_at > self.ttl_seconds:
+                self._remove([entry_id])
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self.hits += 1
+            logger.info(f"Answer cache hit (similarity {score:.3f}) for cached question: {question!r}")
+            return response
+
+    def store(self, question, vector, response):
+        with self._lock:
+            self._check_version()
+            if self._index is None:
+                self._index = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(vector, np.asarray([entry_id], dtype=np.int64))
+            self._entries[entry_id] = (question, response, time.time())
+
+            if len(self._entries) > self.max_entries:
+                overflow = len(self._entries) - self.max_entries
+                self._remove(list(self._entries)[:overflow])
+
+    def wrap(self, chain):
+        """
+        Returns a runnable with the same input/output (and stream chunks) as `chain`
+        that answers near-duplicate questions from the cache.
+        """
+        return CachedChain(cache=self, chain=chain)
+
+
+def _merge_chunk(response, chunk):
+    # Stream chunks of the RAG chain are partial dicts; string values (answer tokens) concatenate
+    for key, value in chunk.items():
+        if isinstance(value, str) and isinstance(response.get(key), str):
+            response[key] += value
+        else:
+            response[key] = value
+
+
+def _cached_chunks(response):
+    # Replays a cached answer in stream order: sources first, then the whole answer as one chunk
+    if not isinstance(response, dict):
+        yield response
+        return
+    if "source_documents" in response:
+        yield {"source_documents": response["source_documents"]}
+    rest = {k: v for k, v in response.items() if k != "source_documents"}
+    if rest:
+        yield rest
+
+
+class CachedChain(Runnable):
+    """Runnable wrapper that consults a SemanticAnswerCache before running `chain`."""
+
+    def __init__(self, cache, chain):
+        self.cache = cache
+        self.chain = chain
+
+    def invoke(self, input, config=None, **kwargs):
+        vector = self.cache.embed(input)
+        cached = self.cache.lookup(vector)
+        if cached is not None:
+            return copy.copy(cached)
+        response = self.chain.invoke(input, config, **kwargs)
+        self.cache.store(input, vector, response)
+        return response
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        # Embedding and the index search are CPU-bound, keep them off the event loop
+        vector = await asyncio.to_thread(self.cache.embed, input)
+        cached = await asyncio.to_thread(self.cache.lookup, vector)
+        if cached is not None:
+            return copy.copy(cached)
+        response = await self.chain.ainvoke(input, config, **kwargs)
+        self.cache.store(input, vector, response)
+        return response
+
+    def stream(self, input, config=None, **kwargs):
+        vector = self.cache.embed(input)
+        cached = self.cache.lookup(vector)
+        if cached is not None:
+            yield from _cached_chunks(cached)
+            return
+        response = {}
+        for chunk in self.chain.stream(input, config, **kwargs):
+            _merge_chunk(response, chunk)
+            yield chunk
+        # Only completed streams are cached
+        self.cache.store(input, vector, response)
+
+    async def astream(self, input, config=None, **kwargs):
+        vector = await asyncio.to_thread(self.cache.embed, input)
+        cached = await asyncio.to_thread(self.cache.lookup, vector)
+        if cached is not None:
+            for chunk in _cached_chunks(cached):
+                yield chunk
+            return
+        response = {}
+        async for chunk in self.chain.astream(input, config, **kwargs):
+            _merge_chunk(response, chunk)
+            yield chunk
+        self.cache.store(input, vector, response)
@@ -5,11 +5,18 @@ import torch
 from sentence_transformers import SentenceTransformer
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from src.knowledge_graph.utils.common import read_json, write_json
+from src.knowledge_graph.components.embedding_cache import EmbeddingCache
+from src.knowledge_graph.components.metadata_store import ChunkMetadataStore, ChunkMetadataWriter
+from src.knowledge_graph.components.vector_index import build_index, supports_incremental_update
+from src.knowledge_graph.utils.common import read_json, write_json, read_jsonl
 from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.logger.metrics import span
 from src.knowledge_graph.exception.exception import KGException
 import sys
 
+# Chunks per streamed group and model.encode call (the model still batches them by 32 internally)
+ENCODE_GROUP = 2048
+
 class DataEmbedding:
     """
     Milestone-3: Data Embedding Pipeline
@@ -17,15 +24,18 @@ class DataEmbedding:
     Optimized for RAG:
     - Preserves text content in metadata (Essential for retrieval).
     - Uses GPU acceleration if available.
-    - Implements batched processing.
+    - Streams chunks through the model and into the metadata store in groups.
+    - Reuses cached embeddings of unchanged chunks.
     """
 
     def __init__(self, config):
         try:
             self.config = config
             
-            # 1. Load Data
-            self.documents = read_json(self.config.input_json)
+            # 1. Load Data (only records without vectors on incremental runs)
+            self.deleted_ids = set()
+            self.incremental = False
+            self.documents = self._load_documents()
             
             # 2. Setup Device (GPU/CPU)
             self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -45,108 +55,189 @@ class DataEmbedding:
                 is_separator_regex=False,
             )
 
+            # 4b. Embedding cache (only misses are sent to the model)
+            cache_cfg = self.config.embedding_cache
+            self.cache = None
+            if cache_cfg.enabled:
+                self.cache = EmbeddingCache(
+                    cache_cfg.cache_dir,
+                    self.config.embedding_model.name,
+                    self.config.embedding_model.embedding_dim,
+                    dtype=cache_cfg.dtype,
+                )
+
             # 5. Output Paths
             self.index_path = self.config.vector_store.index_path
             self.metadata_path = self.config.vector_store.metadata_path
+            self.params_path = self.config.vector_store.params_path
 
-            # Runtime Storage
-            self.text_chunks = []
-            self.metadata = []
+            # Runtime State
+            self.index = None
+            self.chunk_count = 0      # Chunks embedded in this run
 
         except Exception as e:
             raise KGException(e, sys)
 
-    def prepare_chunks(self):
+    def _load_documents(self):
         """
-        Step 1: Chunking
-        Splits text and prepares metadata.
-        CRITICAL: We must store the actual text in metadata for RAG retrieval.
+        Lazy record stream: the records that have no vectors yet when the existing
+        store can be updated in place, else the full corpus. The store's own document
+        ids decide, so records of a run that failed before saving are picked up next time.
         """
-        logger.info("Starting text chunking...")
-        
-        try:
-            global_chunk_id = 0
-            
-            for doc in self.documents:
-                # Handle potentially missing text
-                raw_text = doc.get("text", "")
-                if not raw_text:
-                    continue
-                    
-                chunks = self.text_splitter.split_text(raw_text)
-
-                for chunk in chunks:
-                    self.text_chunks.append(chunk)
-                    
-                    # Store rich metadata including the text itself
-                    self.metadata.append({
-                        "id": global_chunk_id,
-                        "document_id": doc.get("id"),
-                        "source_name": doc.get("source_name"),
-                        "source_type": doc.get("source_type"),
-                        "text": chunk,  # <--- CRITICAL FOR RAG
-                        "created_at": doc.get("ingestion_timestamp")
-                    })
-                    global_chunk_id += 1
-
-            logger.info(f"Chunking complete. Generated {len(self.text_chunks)} chunks.")
+        cfg = self.config
+        vs = cfg.vector_store
+        # A metadata.json from before the memory-mapped store can still be updated in place
+        ChunkMetadataStore.migrate_legacy(vs.metadata_path)
+        store_exists = os.path.exists(vs.index_path) and ChunkMetadataStore.exists(vs.metadata_path)
+        previous_params = read_json(vs.params_path) if os.path.exists(vs.params_path) else None
+        if cfg.incremental and store_exists and supports_incremental_update(vs.index_type, vs.metric, previous_params):
+            embedded_ids = ChunkMetadataStore(vs.metadata_path).document_ids()
+            # Ids first: stale vectors are removed before the new ones are appended
+            current_ids = {record["id"] for record in read_jsonl(cfg.input_records)}
+            self.incremental = True
+            self.deleted_ids = embedded_ids - current_ids
+            logger.info(f"Incremental run: {len(current_ids - embedded_ids)} records without vectors, "
+                        f"{len(self.deleted_ids)} embedded records no longer in the corpus.")
+            return (record for record in read_jsonl(cfg.input_records) if record["id"] not in embedded_ids)
+        return read_jsonl(cfg.input_records)
+
+    def load_existing_store(self, writer):
+        """
+        Incremental runs start from the saved index and metadata, minus the vectors
+        of deleted (or changed) records. Flat indexes keep positions contiguous on removal;
+        the surviving metadata rows are copied to `writer` in the same order.
+        """
+        if not self.incremental:
+            return
 
-        except Exception as e:
-            raise KGException(e, sys)
+        self.index = faiss.read_index(self.index_path)
+        existing = ChunkMetadataStore(self.metadata_path)
+
+        # Compared on the raw column, so no row is decoded
+        deleted = np.array([str(doc_id).encode("utf-8") for doc_id in self.deleted_ids], dtype="S")
+        is_stale = np.isin(existing.columns["document_id"], deleted) if len(deleted) else \
+            np.zeros(len(existing), dtype=bool)
+        stale = np.flatnonzero(is_stale)
+        if len(stale):
+            self.index.remove_ids(stale.astype("int64"))
+
+        writer.copy_rows(existing, np.flatnonzero(~is_stale))
+        logger.info(f"Loaded existing vector store: kept {len(writer)}, removed {len(stale)} chunks.")
 
-    def generate_embeddings(self):
+    def prepare_chunks(self):
+        """
+        Step 1: Chunking
+        Splits the records and yields them in groups of up to ENCODE_GROUP (chunk, record)
+        pairs, so only one group of chunk texts is held in memory at a time.
+        CRITICAL: The chunk text is stored in the metadata for RAG retrieval.
+        """
+        group = []
+        for doc in self.documents:
+            # Handle potentially missing text
+            raw_text = doc.get("text", "")
+            if not raw_text:
+                continue
+
+            for chunk in self.text_splitter.split_text(raw_text):
+                group.append((chunk, doc))
+                if len(group) >= ENCODE_GROUP:
+                    yield group
+                    group = []
+        if group:
+            yield group
+
+    def generate_embeddings(self, texts):
         """
         Step 2: Vectorization
-        Generates embeddings using the loaded model.
+        Embeds one group of chunk texts (cached vectors are reused).
         """
-        logger.info("Starting embedding generation...")
-        
+        if self.cache is not None:
+            return self.cache.encode(texts, self._encode)
+        return self._encode(texts)
+
+    def build_vector_store(self):
+        """
+        Streams chunk groups through the model into the index and the metadata store, where
+        row i describes vector i. Only the vectors are kept until the end (ANN indexes are
+        trained on all of them); chunk texts go straight to disk.
+        """
+        logger.info("Starting chunking and embedding generation...")
+
         try:
-            if not self.text_chunks:
-                logger.warning("No text chunks to embed.")
-                return np.array([])
-
-            # Encode in batches to manage memory
-            batch_size = 32
-            embeddings = self.model.encode(
-                self.text_chunks,
-                batch_size=batch_size,
-                show_progress_bar=True,
-                convert_to_numpy=True,
-                normalize_embeddings=True # Good for cosine similarity search
-            )
-            
-            logger.info(f"Generated embeddings with shape: {embeddings.shape}")
-            return embeddings
+            new_vectors = []
+            with ChunkMetadataWriter(self.metadata_path) as writer:
+                self.load_existing_store(writer)
+
+                for group in self.prepare_chunks():
+                    embeddings = self.generate_embeddings([chunk for chunk, _ in group])
+                    for chunk, doc in group:
+                        writer.append(doc.get("id"), doc.get("source_name"), doc.get("source_type"),
+                                      chunk, doc.get("ingestion_timestamp"))
+
+                    if self.index is not None:
+                        # Incremental (flat indexes only): append to the existing index right away
+                        self.index.add(embeddings)
+                    else:
+                        new_vectors.append(embeddings)
+                    self.chunk_count += len(group)
+                    logger.info(f"Embedded {self.chunk_count} chunks")
+
+                logger.info(f"Chunking complete. Generated {self.chunk_count} chunks.")
+                embeddings = np.concatenate(new_vectors) if new_vectors else np.empty((0, 0), dtype=np.float32)
+                del new_vectors
+                self.save_vector_store(embeddings, writer)
 
         except Exception as e:
             raise KGException(e, sys)
 
-    def save_vector_store(self, embeddings):
+    def _encode(self, texts):
+        # Encode in batches to manage memory; each group of ENCODE_GROUP texts is one timed span
+        batch_size = 32
+        parts = []
+        for start in range(0, len(texts), ENCODE_GROUP):
+            group = texts[start:start + ENCODE_GROUP]
+            with span("embedding.batch", device=self.device) as timing:
+                parts.append(self.model.encode(
+                    group,
+                    batch_size=batch_size,
+                    show_progress_bar=False,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True # Good for cosine similarity search
+                ))
+                timing.add(len(group))
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def save_vector_store(self, embeddings, writer):
         """
-        Step 3: Storage (FAISS + Metadata)
+        Step 3: Storage (FAISS; the metadata rows are already streamed to the store)
+        The index and its build params are staged on `writer`, so they replace the live
+        files together with the metadata store when it is swapped in.
         """
-        logger.info("Saving Vector Store and Metadata...")
+        logger.info("Saving Vector Store...")
         
         try:
-            # --- A. Save Metadata ---
-            # We save metadata as a JSON list where index i corresponds to vector i
-            os.makedirs(os.path.dirname(self.metadata_path), exist_ok=True)
-            write_json(self.metadata_path, self.metadata)
-            
-            # --- B. Save FAISS Index ---
-            if len(embeddings) > 0:
-                dimension = embeddings.shape[1]
-                
-                # Using FlatL2 (Euclidean Distance). 
-                # For huge datasets (>100k), consider IndexIVFFlat.
-                index = faiss.IndexFlatL2(dimension)
-                index.add(embeddings)
+            # --- Save FAISS Index ---
+            if self.index is not None:
+                # Incremental (flat indexes only): the new vectors were added while streaming
+                faiss.write_index(self.index, writer.stage(self.index_path))
+
+                build_params = read_json(self.params_path) if os.path.exists(self.params_path) else {}
+                build_params["ntotal"] = self.index.ntotal
+                write_json(writer.stage(self.params_path), build_params)
+                logger.info(f"FAISS index updated at {self.index_path} ({self.index.ntotal} vectors)")
+            elif len(embeddings) > 0:
+                # Flat / IVF / HNSW / IVF-PQ depending on vector_store.index_type, IP or L2 metric
+                vs = self.config.vector_store
+                with span("faiss.build", index_type=vs.index_type) as timing:
+                    index, build_params = build_index(embeddings, vs.index_type, vs.index_params, metric=vs.metric)
+                    timing.add(len(embeddings))
                 
                 os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
-                faiss.write_index(index, self.index_path)
+                faiss.write_index(index, writer.stage(self.index_path))
+                # Record how the index was built next to it
+                write_json(writer.stage(self.params_path), build_params)
                 
-                logger.info(f"FAISS index saved to {self.index_path}")
+                logger.info(f"FAISS {build_params['factory']} index saved to {self.index_path}")
             else:
                 logger.warning("No embeddings to save.")
 
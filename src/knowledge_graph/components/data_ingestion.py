@@ -1,91 +1,186 @@
 import os
 import json
 import sqlite3
+from contextlib import closing
 import pandas as pd
 from datetime import datetime
-from src.knowledge_graph.utils.common import write_json
+from concurrent.futures.process import BrokenProcessPool
+from src.knowledge_graph.utils.common import (read_json, write_json, read_jsonl, open_text,
+                                             file_sha256, text_hash, make_executor, ordered_futures)
 from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.logger.metrics import span
 from src.knowledge_graph.exception.exception import KGException
 import sys
 import pypdf 
 class DataIngestion:
     def __init__(self, config):
         self.config = config
-        self.records = []
-        self.counter = 1
 
-    def _create_record(self, source_type, source_name, metadata, text):
+        # Incremental state: previous manifest vs. the one built during this run
+        self.full_rebuild = not (
+            config.incremental
+            and os.path.exists(config.manifest_path)
+            and os.path.exists(config.output_records)
+        )
+        self.manifest = {} if self.full_rebuild else read_json(config.manifest_path)["sources"]
+        self.previous_ids = {rid for src in self.manifest.values() for rid in src["record_ids"]}
+        self.new_manifest = {}
+        self.unchanged_ids = set()    # Record ids carried over from skipped sources
+
+        # Records are streamed to this JSONL writer while sources are read (opened in ingest())
+        self._records_out = None
+        self.record_count = 0         # Records re-read from new or changed sources
+        self.added_count = 0          # ... of which did not exist before
+
+        # Worker pool for CPU-bound parsing/rendering (created in ingest())
+        self.executor = None
+        self.max_pending = 2 * max(1, config.parallel.num_workers)
+
+    @staticmethod
+    def _create_record(source_type, source_name, metadata, text):
         """Standardizes the record format."""
         # Skip empty text to reduce noise
         if not text or not text.strip():
             return None
-            
+
+        text = text.strip()
         record = {
-            "id": self.counter,
+            # Content-derived id: stable across runs and independent of ingestion order
+            "id": text_hash(f"{source_type}|{source_name}|{text}"),
             "source_type": source_type,
             "source_name": source_name,
             "metadata": metadata,
-            "text": text.strip(),
+            "text": text,
             "ingestion_timestamp": datetime.utcnow().isoformat()
         }
-        self.counter += 1
         return record
 
-    def _row_to_text(self, row, columns):
+    def _fingerprint(self, path, previous=None):
+        """path/mtime/size/sha256 of a source; the hash is reused when mtime and size match."""
+        stat = os.stat(path)
+        fingerprint = {"path": path, "mtime": stat.st_mtime, "size": stat.st_size}
+        if previous and previous["mtime"] == stat.st_mtime and previous["size"] == stat.st_size:
+            fingerprint["sha256"] = previous["sha256"]
+        else:
+            fingerprint["sha256"] = file_sha256(path)
+        return fingerprint
+
+    def _changed_sources(self, paths):
         """
-        Converts a dataframe row to a semantic string.
-        Before: "John 30 Engineer"
-        After: "Name: John, Age: 30, Role: Engineer"
+        Returns (path, previous, fingerprint) for the sources that must be (re)read.
+        Sources whose content hash matches the manifest carry their previous records over.
         """
+        changed = []
+        for path in paths:
+            previous = self.manifest.get(path)
+            fingerprint = self._fingerprint(path, previous)
+
+            if previous and fingerprint["sha256"] == previous["sha256"]:
+                fingerprint["record_ids"] = previous["record_ids"]
+                self.new_manifest[path] = fingerprint
+                self.unchanged_ids.update(previous["record_ids"])
+            else:
+                changed.append((path, previous, fingerprint))
+        return changed
+
+    def _keep_previous(self, path, previous):
+        """Keeps serving the last good version of a source that could not be read."""
+        if previous:
+            self.new_manifest[path] = previous
+            self.unchanged_ids.update(previous["record_ids"])
+
+    def _store_source(self, path, previous, fingerprint, records):
+        """Streams the records of one (re)read source to the output and records it in the manifest."""
+        # Identical rows inside one source share an id, keep the first occurrence
+        record_ids = []
+        seen = set()
         try:
-            return ", ".join([f"{col}: {val}" for col, val in zip(columns, row) if pd.notna(val)])
+            for record in records:
+                if record and record["id"] not in seen:
+                    seen.add(record["id"])
+                    record_ids.append(record["id"])
+                    self._emit(record)
         except Exception:
-            return " ".join(map(str, row))
+            # Partially read: keep the previous records that were not re-emitted
+            if previous:
+                self.new_manifest[path] = dict(previous, record_ids=previous["record_ids"] + record_ids)
+                self.unchanged_ids.update(rid for rid in previous["record_ids"] if rid not in seen)
+            raise
+
+        fingerprint["record_ids"] = record_ids
+        self.new_manifest[path] = fingerprint
+
+    def _emit(self, record):
+        """Appends a record to the output store, counting it as added if it did not exist before."""
+        self._records_out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.record_count += 1
+        if record["id"] not in self.previous_ids:
+            self.added_count += 1
+
+    @staticmethod
+    def _rows_to_text(chunk):
+        """
+        Converts every row of a dataframe chunk to a semantic string, column by column.
+        Before: "John 30 Engineer"
+        After: "Name: John, Age: 30, Role: Engineer"
+        """
+        texts = pd.Series("", index=chunk.index, dtype=object)
+        for position, col in enumerate(chunk.columns):
+            values = chunk.iloc[:, position]
+            # Missing cells contribute nothing, so they also skip the separator
+            piece = (f", {col}: " + values.astype(str)).where(values.notna(), "")
+            texts = texts + piece
+        return texts.str[2:].tolist()
+
+    @staticmethod
+    def _create_records(source_type, source_name, metadata, texts):
+        """Batch form of _create_record: one shared metadata dict and timestamp per chunk."""
+        timestamp = datetime.utcnow().isoformat()
+        records = []
+        for text in texts:
+            text = text.strip()
+            if not text:
+                continue
+            records.append({
+                "id": text_hash(f"{source_type}|{source_name}|{text}"),
+                "source_type": source_type,
+                "source_name": source_name,
+                "metadata": metadata,
+                "text": text,
+                "ingestion_timestamp": timestamp
+            })
+        return records
+
+    def _render_chunks(self, source_type, source_name, metadata, chunks):
+        """Renders DataFrame chunks to records on the worker pool, yielding them in row order."""
+        tasks = ((source_type, source_name, metadata, chunk) for chunk in chunks)
+        for future in ordered_futures(self.executor, _render_rows, tasks, self.max_pending):
+            yield from future.result()
 
     # ---------- EMAIL INGESTION ----------
     def ingest_emails(self):
         logger.info("Starting Email Ingestion...")
         try:
-            files = [f for f in os.listdir(self.config.email_dir) if f.endswith(".txt")]
-            
-            for file in files:
-                path = os.path.join(self.config.email_dir, file)
-                try:
-                    with open(path, "r", encoding="utf-8", errors="replace") as f:
-                        content = f.read()
-
-                    # Split header and body (assuming standard double newline separation)
-                    parts = content.split("\n\n", 1)
-                    header_block = parts[0] if len(parts) > 0 else ""
-                    body_text = parts[1] if len(parts) > 1 else ""
-                    
-                    # Parse headers safely
-                    headers = {}
-                    for line in header_block.splitlines():
-                        if ":" in line:
-                            key, value = line.split(":", 1)
-                            headers[key.strip().lower()] = value.strip()
-
-                    # Fallback if body is empty but content exists
-                    if not body_text and not headers:
-                        body_text = content
-
-                    record = self._create_record(
-                        source_type="email",
-                        source_name=file,
-                        metadata={
-                            "from": headers.get("from"),
-                            "to": headers.get("to"),
-                            "date": headers.get("date"),
-                            "subject": headers.get("subject")
-                        },
-                        text=body_text
-                    )
-                    if record: self.records.append(record)
+            files = sorted(f for f in os.listdir(self.config.email_dir) if f.endswith(".txt"))
+            changed = self._changed_sources([os.path.join(self.config.email_dir, f) for f in files])
 
+            # One task per file, consumed in submission order
+            tasks = ((path,) for path, _, _ in changed)
+            futures = ordered_futures(self.executor, _read_email, tasks, self.max_pending)
+            for (path, previous, fingerprint), future in zip(changed, futures):
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    # A dead worker pool fails the whole run, not just this source
+                    raise
                 except Exception as e:
-                    logger.warning(f"Failed to process email {file}: {e}")
+                    logger.warning(f"Failed to process email {os.path.basename(path)}: {e}")
+                    self._keep_previous(path, previous)
+                    continue
+                self._store_source(path, previous, fingerprint, [record])
 
+        except BrokenProcessPool:
+            raise
         except Exception as e:
             logger.error(f"Critical error in email ingestion: {e}")
 
@@ -93,32 +188,52 @@ class DataIngestion:
     def ingest_pdfs(self):
         logger.info("Starting PDF Ingestion...")
         try:
-            files = [f for f in os.listdir(self.config.pdf_dir) if f.endswith(".pdf")]
-            
-            for file in files:
-                path = os.path.join(self.config.pdf_dir, file)
-                try:
-                    text_content = []
-                    reader = pypdf.PdfReader(path)
-                    
-                    for page in reader.pages:
-                        extracted = page.extract_text()
-                        if extracted:
-                            text_content.append(extracted)
-                    
-                    full_text = "\n".join(text_content)
-
-                    record = self._create_record(
-                        source_type="pdf",
-                        source_name=file,
-                        metadata={"pages": len(reader.pages)},
-                        text=full_text
-                    )
-                    if record: self.records.append(record)
+            files = sorted(f for f in os.listdir(self.config.pdf_dir) if f.endswith(".pdf"))
+            changed = self._changed_sources([os.path.join(self.config.pdf_dir, f) for f in files])
 
+            # Plan page-range tasks for every PDF up front so large files fan out across workers
+            step = self.config.parallel.pdf_pages_per_task
+            plans = []
+            for path, previous, fingerprint in changed:
+                try:
+                    num_pages = len(pypdf.PdfReader(path).pages)
                 except Exception as e:
-                    logger.warning(f"Failed to process PDF {file}: {e}")
+                    logger.warning(f"Failed to process PDF {os.path.basename(path)}: {e}")
+                    self._keep_previous(path, previous)
+                    continue
+                ranges = [(start, min(start + step, num_pages)) for start in range(0, num_pages, step)]
+                plans.append((path, previous, fingerprint, num_pages, ranges))
+
+            tasks = ((path, start, stop) for path, _, _, _, ranges in plans for start, stop in ranges)
+            futures = ordered_futures(self.executor, _extract_pdf_pages, tasks, self.max_pending)
+
+            for path, previous, fingerprint, num_pages, ranges in plans:
+                # Always drain this file's futures so the next file stays aligned
+                text_content, error = [], None
+                for _ in ranges:
+                    future = next(futures)
+                    try:
+                        text_content.extend(future.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        error = error or e
 
+                if error:
+                    logger.warning(f"Failed to process PDF {os.path.basename(path)}: {error}")
+                    self._keep_previous(path, previous)
+                    continue
+
+                record = self._create_record(
+                    source_type="pdf",
+                    source_name=os.path.basename(path),
+                    metadata={"pages": num_pages},
+                    text="\n".join(text_content)
+                )
+                self._store_source(path, previous, fingerprint, [record])
+
+        except BrokenProcessPool:
+            raise
         except Exception as e:
             logger.error(f"Critical error in PDF ingestion: {e}")
 
@@ -126,84 +241,238 @@ class DataIngestion:
     def ingest_csvs(self):
         logger.info("Starting CSV Ingestion...")
         try:
-            files = [f for f in os.listdir(self.config.csv_dir) if f.endswith(".csv")]
-            
-            for file in files:
-                path = os.path.join(self.config.csv_dir, file)
+            files = sorted(f for f in os.listdir(self.config.csv_dir) if f.endswith(".csv"))
+            changed = self._changed_sources([os.path.join(self.config.csv_dir, f) for f in files])
+
+            for path, previous, fingerprint in changed:
+                file = os.path.basename(path)
                 try:
                     # Use chunksize to handle large CSVs without memory crash
-                    chunk_iterator = pd.read_csv(path, chunksize=1000)
-                    
-                    for chunk in chunk_iterator:
-                        columns = list(chunk.columns)
-                        for row in chunk.values:
-                            text = self._row_to_text(row, columns)
-                            
-                            record = self._create_record(
-                                source_type="csv",
-                                source_name=file,
-                                metadata={"columns": columns},
-                                text=text
-                            )
-                            if record: self.records.append(record)
-                            
+                    chunk_iterator = pd.read_csv(path, chunksize=self.config.parallel.chunk_size)
+                    records = self._render_chunks("csv", file, None, chunk_iterator)
+                    self._store_source(path, previous, fingerprint, records)
+                except BrokenProcessPool:
+                    raise
                 except Exception as e:
                     logger.warning(f"Failed to process CSV {file}: {e}")
 
+        except BrokenProcessPool:
+            raise
         except Exception as e:
             logger.error(f"Critical error in CSV ingestion: {e}")
 
     # ---------- DATABASE INGESTION ----------
     def ingest_db(self):
         logger.info("Starting Database Ingestion...")
-        conn = None
         try:
-            conn = sqlite3.connect(self.config.db_path)
-            cursor = conn.cursor()
+            for path, previous, fingerprint in self._changed_sources([self.config.db_path]):
+                self._store_source(path, previous, fingerprint, self._read_db(path))
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            logger.error(f"Database ingestion failed, keeping the previous records: {e}")
+
+    def _read_db(self, path):
+        """
+        Reads every table through read-only connections. Rowid tables are split into
+        rowid ranges (planned with b-tree seeks, read as rowid range scans), and the ranges of all tables run concurrently on the worker pool, each on its own
+        connection, yielded back in table/rowid order. A failed table fails the source.
+        """
+        uri = _sqlite_uri(path, self.config.database.immutable)
+        with closing(sqlite3.connect(uri, uri=True)) as conn:
+            # Page boundaries are planned lazily, as the pool has room for more tasks
+            tasks = self._db_tasks(conn, uri, path)
+            # A failed page propagates: _store_source keeps the previous records and fingerprint
+            for future in ordered_futures(self.executor, _run_task, tasks, self.max_pending):
+                yield from future.result()
 
-            # Get all tables
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
+    def _db_tasks(self, conn, uri, path):
+        """(worker function, *args) tasks for every table, in table/rowid order."""
+        db_cfg = self.config.database
+        # Get all tables
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+        tables = [table_name for (table_name,) in cursor.fetchall()]
 
-            for (table_name,) in tables:
-                try:
-                    # Read in chunks using pandas
-                    # 'chunksize' returns a generator of DataFrames
-                    for chunk in pd.read_sql_query(f"SELECT * FROM {table_name}", conn, chunksize=1000):
-                        columns = list(chunk.columns)
-                        
-                        for row in chunk.values:
-                            text = self._row_to_text(row, columns)
-                            
-                            record = self._create_record(
-                                source_type="database",
-                                source_name=table_name,
-                                metadata={"columns": columns, "db_source": self.config.db_path},
-                                text=text
-                            )
-                            if record: self.records.append(record)
-                            
-                except Exception as e:
-                    logger.warning(f"Failed to ingest table {table_name}: {e}")
+        for table_name in tables:
+            spec = db_cfg.tables.get(table_name) or {}
+            columns = spec.get("columns")
+            where = spec.get("where")
+            try:
+                conn.execute(f"SELECT rowid FROM {_quote(table_name)} LIMIT 0")
+            except sqlite3.OperationalError:
+                # WITHOUT ROWID table: one task pages through it by primary key
+                yield (_read_table_by_key, uri, table_name, columns, where, path, db_cfg.page_size)
+                continue
+            for start, stop in _rowid_pages(conn, table_name, db_cfg.page_size):
+                yield (_read_table_range, uri, table_name, columns, where, path, start, stop)
 
-        except Exception as e:
-            logger.error(f"Database connection error: {e}")
-        finally:
-            if conn: conn.close()
+    def _finalize_outputs(self):
+        """
+        Appends the records of unchanged sources from the previous store, then writes
+        the change set summary and the new manifest.
+        """
+        if self.unchanged_ids:
+            for record in read_jsonl(self.config.output_records):
+                if record["id"] in self.unchanged_ids:
+                    self._records_out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        current_ids = {rid for src in self.new_manifest.values() for rid in src["record_ids"]}
+        delta = {
+            "full_rebuild": self.full_rebuild,
+            "added": self.added_count,
+            "deleted": sorted(self.previous_ids - current_ids),
+        }
+        write_json(self.config.delta_json, delta)
+        write_json(self.config.manifest_path, {"sources": self.new_manifest})
+        logger.info(f"Delta: {delta['added']} added, {len(delta['deleted'])} deleted records "
+                    f"(full rebuild: {self.full_rebuild})")
 
     # ---------- MAIN PIPELINE ----------
     def ingest(self):
         try:
             logger.info(f">>> Ingestion Started at {datetime.now()}")
-            
-            self.ingest_emails()
-            self.ingest_pdfs()
-            self.ingest_csvs()
-            self.ingest_db()
 
-            write_json(self.config.output_json, self.records)
+            # The previous store is still read for carried-over records, so write next to it first
+            out_dir, out_name = os.path.split(self.config.output_records)
+            tmp_path = os.path.join(out_dir, f"tmp_{out_name}")
+            with make_executor(self.config.parallel.num_workers) as self.executor, \
+                    open_text(tmp_path, "wt") as self._records_out:
+                for source_type, ingest_fn in (("email", self.ingest_emails), ("pdf", self.ingest_pdfs),
+                                               ("csv", self.ingest_csvs), ("database", self.ingest_db)):
+                    with span("ingestion", source_type=source_type) as timing:
+                        before = self.record_count
+                        ingest_fn()
+                        timing.add(self.record_count - before)
+
+                self._finalize_outputs()
+            os.replace(tmp_path, self.config.output_records)
             
-            logger.info(f"<<< Ingestion Completed. Total Records: {len(self.records)}")
+            logger.info(f"<<< Ingestion Completed. Sources: {len(self.new_manifest)}, "
+                        f"Re-read Records: {self.record_count}")
             
         except Exception as e:
-            raise KGException(e, sys)
\ No newline at end of file
+            raise KGException(e, sys)
+
+
+# ---------- WORKER TASKS ----------
+# Module-level so they can be pickled into the process pool.
+
+def _read_email(path):
+    file = os.path.basename(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+
+    # Split header and body (assuming standard double newline separation)
+    parts = content.split("\n\n", 1)
+    header_block = parts[0] if len(parts) > 0 else ""
+    body_text = parts[1] if len(parts) > 1 else ""
+    
+    # Parse headers safely
+    headers = {}
+    for line in header_block.splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+
+    # Fallback if body is empty but content exists
+    if not body_text and not headers:
+        body_text = content
+
+    return DataIngestion._create_record(
+        source_type="email",
+        source_name=file,
+        metadata={
+            "from": headers.get("from"),
+            "to": headers.get("to"),
+            "date": headers.get("date"),
+            "subject": headers.get("subject")
+        },
+        text=body_text
+    )
+
+def _extract_pdf_pages(path, start, stop):
+    """Text of pages [start, stop) of one PDF."""
+    reader = pypdf.PdfReader(path)
+    text_content = []
+    for page in reader.pages[start:stop]:
+        extracted = page.extract_text()
+        if extracted:
+            text_content.append(extracted)
+    return text_content
+
+_MAX_ROWID = 2**63 - 1
+
+def _quote(identifier):
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+def _sqlite_uri(path, immutable):
+    """Read-only URI; immutable also skips locking for snapshots nobody writes to."""
+    uri = f"file:{os.path.abspath(path)}?mode=ro"
+    return uri + "&immutable=1" if immutable else uri
+
+def _select_sql(table_name, columns, where, key, leading=()):
+    """
+    SELECT over one table filtered by `key` and the configured `where`. Built by
+    concatenation: `where` and identifiers are user text and may contain braces.
+    """
+    projection = list(leading) + ([_quote(c) for c in columns] if columns else ["*"])
+    sql = "SELECT " + ", ".join(projection) + " FROM " + _quote(table_name) + " WHERE " + key
+    return sql + " AND (" + where + ")" if where else sql
+
+def _rowid_pages(conn, table_name, page_size):
+    """
+    [start, stop) rowid ranges `page_size` keys wide, planned without reading row data:
+    dense rowids give about `page_size` rows per range, and after each range a single
+    b-tree seek jumps to the next existing rowid, so gaps in the key space yield no tasks.
+    Sparse tables get thinner ranges, never more ranges than rows.
+    """
+    table = _quote(table_name)
+    (start,) = conn.execute(f"SELECT min(rowid) FROM {table}").fetchone()
+    while start is not None:
+        stop = start + int(page_size)
+        yield start, stop
+        row = conn.execute(
+            f"SELECT rowid FROM {table} WHERE rowid >= ? ORDER BY rowid LIMIT 1", (stop,)
+        ).fetchone() if stop <= _MAX_ROWID else None
+        start = row[0] if row else None
+
+def _read_table_range(uri, table_name, columns, where, db_path, start, stop):
+    """Rows of one table with start <= rowid < stop (a rowid range scan), rendered to records."""
+    sql = _select_sql(table_name, columns, where, "rowid >= ? AND rowid < ?") + " ORDER BY rowid"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        # stop may pass the largest rowid; SQLite compares an out-of-range integer bound as a float
+        chunk = pd.read_sql_query(sql, conn, params=(start, stop if stop <= _MAX_ROWID else float(stop)))
+    return _render_rows("database", table_name, {"db_source": db_path}, chunk)
+
+def _read_table_by_key(uri, table_name, columns, where, db_path, page_size):
+    """Keyset pagination over the primary key, for tables without a rowid."""
+    records = []
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        info = conn.execute(f"PRAGMA table_info({_quote(table_name)})").fetchall()
+        key_cols = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5] > 0]
+        key = ", ".join(_quote(c) for c in key_cols)
+        # Select the key columns under aliases so a projection without them still pages correctly
+        aliases = [f"__key{i}" for i in range(len(key_cols))]
+        leading = [f"{_quote(c)} AS {a}" for c, a in zip(key_cols, aliases)]
+
+        last = None
+        while True:
+            condition = f"({key}) > ({', '.join('?' * len(key_cols))})" if last else "1"
+            sql = _select_sql(table_name, columns, where, condition, leading) + f" ORDER BY {key} LIMIT {int(page_size)}"
+            chunk = pd.read_sql_query(sql, conn, params=last or ())
+            if chunk.empty:
+                break
+            # to_dict yields native Python values (numpy scalars would bind as BLOBs)
+            last = tuple(chunk[aliases].tail(1).to_dict("records")[0].values())
+            records.extend(_render_rows("database", table_name, {"db_source": db_path}, chunk.drop(columns=aliases)))
+    return records
+
+def _run_task(fn, *args):
+    """Runs a (fn, *args) task, so tasks of different kinds can share one ordered stream."""
+    return fn(*args)
+
+def _render_rows(source_type, source_name, extra_metadata, chunk):
+    """Renders one DataFrame chunk to records."""
+    metadata = {"columns": list(chunk.columns), **(extra_metadata or {})}
+    texts = DataIngestion._rows_to_text(chunk)
+    return DataIngestion._create_records(source_type, source_name, metadata, texts)
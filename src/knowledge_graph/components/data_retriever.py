@@ -1,73 +1,219 @@
 import sys
+import asyncio
 from langchain_core.retrievers import BaseRetriever
-from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.callbacks import CallbackManagerForRetrieverRun, AsyncCallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from src.knowledge_graph.components.vector_index import configure_search, similarity_scores
+from src.knowledge_graph.components.graph_schema import ENTITY_FULLTEXT_INDEX, entity_search_query
 from src.knowledge_graph.exception.exception import KGException
 from src.knowledge_graph.logger.logging import logger
-from typing import List, Any
+from src.knowledge_graph.logger.metrics import span
+from typing import List, Any, Optional
 from dotenv import load_dotenv
 load_dotenv()
+
+# Index-backed fuzzy/prefix match for all query entities in one round trip.
+# The best-scoring nodes are expanded first and the limit applies per entity.
+# Edges are matched in both directions but returned in their stored direction, with
+# their element id, so one edge reached from two query entities is recognised as one fact.
+ENTITY_CYPHER = """
+UNWIND $lookups AS lookup
+CALL {
+    WITH lookup
+    CALL db.index.fulltext.queryNodes($index, lookup.query) YIELD node, score
+    WITH node, score
+    LIMIT $limit
+    MATCH (node)-[r]-(:Entity)
+    RETURN elementId(r) AS edge_id, startNode(r).name AS source, type(r) AS rel,
+           endNode(r).name AS target, score
+    ORDER BY score DESC
+    LIMIT $limit
+}
+RETURN lookup.entity AS entity, edge_id, source, rel, target, score
+"""
+
 class HybridRetriever(BaseRetriever):
     """
-    Same Retriever logic as before (Vectors + Graph)
+    Same Retriever logic as before (Vectors + Graph).
+    The async path runs both branches concurrently, each under its own timeout.
     """
     vector_index: Any
-    vector_metadata: List[dict]
+    vector_metadata: Any             # ChunkMetadataStore (or any list of dicts) indexed by vector id
     embedder: Any
     graph: Any
     nlp: Any
+    async_graph: Any = None          # neo4j.AsyncDriver; without it the graph branch runs in a thread
     top_k_vector: int = 5
     top_k_graph: int = 5
+    nprobe: Optional[int] = None     # IVF lists probed per query
+    ef_search: Optional[int] = None  # HNSW candidate list size per query
+    score_threshold: Optional[float] = None  # Minimum cosine similarity for vector hits
+    vector_timeout: Optional[float] = None   # Seconds before the async vector branch is dropped
+    graph_timeout: Optional[float] = None    # Seconds before the async graph branch is dropped
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         logger.info("Initializing HybridRetriever")
+        self.vector_index = configure_search(self.vector_index, self.nprobe, self.ef_search)
 
     def _get_relevant_documents(
         self, query: str, *, run_manager: CallbackManagerForRetrieverRun
     ) -> List[Document]:
+        with span("retrieval", mode="sync"):
+            docs = self._vector_search([query])[0]
+            logger.info("Vector search completed, proceeding to graph search")
+            docs.extend(self._graph_search(self._extract_entities([query]))[0])
+        return docs
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        # Vector search and NER -> graph lookup overlap, so latency is the slower branch, not the sum
+        with span("retrieval", mode="async"):
+            vector_docs, graph_docs = await asyncio.gather(
+                self._with_timeout(asyncio.to_thread(self._vector_search, [query]), self.vector_timeout, "vector"),
+                self._with_timeout(self._agraph_search([query]), self.graph_timeout, "graph"),
+            )
+        return (vector_docs[0] if vector_docs else []) + (graph_docs[0] if graph_docs else [])
+
+    # 🔁 BATCH: one encode call, one matrix search, one nlp.pipe pass and one Cypher call for all queries.
+    # Bulk runs skip the per-query callbacks and timeouts of invoke/ainvoke.
+    def batch(self, inputs: List[str], config=None, **kwargs) -> List[List[Document]]:
+        if not inputs:
+            return []
+        logger.info(f"Batch retrieval for {len(inputs)} queries")
+        with span("retrieval", mode="batch") as timing:
+            vector_docs = self._vector_search(inputs)
+            graph_docs = self._graph_search(self._extract_entities(inputs))
+            timing.add(len(inputs))
+        return [v + g for v, g in zip(vector_docs, graph_docs)]
+
+    async def abatch(self, inputs: List[str], config=None, **kwargs) -> List[List[Document]]:
+        if not inputs:
+            return []
+        logger.info(f"Batch retrieval for {len(inputs)} queries")
+        with span("retrieval", mode="abatch") as timing:
+            vector_docs, graph_docs = await asyncio.gather(
+                asyncio.to_thread(self._vector_search, inputs),
+                self._agraph_search(inputs),
+            )
+            timing.add(len(inputs))
+        return [v + g for v, g in zip(vector_docs, graph_docs)]
+
+    @staticmethod
+    async def _with_timeout(coro, timeout, branch):
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{branch} retrieval exceeded {timeout}s, answering without it")
+            return []
+
+    # 1. Vector Search (normalized queries, same space as the stored embeddings)
+    def _vector_search(self, queries):
+        """Vector hits for every query, from a single encode call and a single index search."""
         logger.info("Initializing vector search")
-        # 1. Vector Search
-        query_vector = self.embedder.encode([query])
-        _, indices = self.vector_index.search(query_vector, self.top_k_vector)
-        
-        docs = []
-        for idx in indices[0]:
-            if idx < len(self.vector_metadata):
-                meta = self.vector_metadata[idx]
-                content = f"[Source: {meta.get('source_name', 'Unknown')}] {meta.get('text', '')}"
-                docs.append(Document(
-                    page_content=content,
-                    metadata={"type": "vector", "source": meta.get('source_name')}
-                ))
-        logger.info("Vector search completed, proceeding to graph search")
-        # 2. Graph Search (Fixed for neo4j.Driver)
-        spacy_doc = self.nlp(query)
-        entities = [ent.text for ent in spacy_doc.ents]
-        logger.info("Opening Graph session for entity search")
-        if entities:
-            # Open a session properly using the driver
-            try:
-                with self.graph.session() as session:
-                    for entity in entities:
-                        # Fuzzy match entity names
-                        cypher = """
-                        MATCH (n:Entity)-[r]-(m:Entity)
-                        WHERE toLower(n.name) CONTAINS toLower($name)
-                        RETURN n.name, type(r) AS rel, m.name
-                        LIMIT $limit
-                        """
-                        # Use session.run with parameters (safer than f-strings)
-                        result = session.run(cypher, name=entity, limit=self.top_k_graph)
-                        
-                        for record in result:
-                            fact = f"{record['n.name']} --[{record['rel']}]--> {record['m.name']}"
-                            docs.append(Document(
-                                page_content=fact,
-                                metadata={"type": "graph", "entity": entity}
-                            ))
-                logger.info("Graph search completed")
-            except Exception as e:
-                raise KGException(e,sys)
-        
-        return docs
\ No newline at end of file
+        with span("query.embed") as timing:
+            query_vectors = self.embedder.encode(queries, normalize_embeddings=True)
+            timing.add(len(queries))
+        with span("faiss.search") as timing:
+            distances, indices = self.vector_index.search(query_vectors, self.top_k_vector)
+            timing.add(len(queries))
+        scores = similarity_scores(self.vector_index, distances)
+
+        results = []
+        for row_indices, row_scores in zip(indices, scores):
+            docs = []
+            for idx, score in zip(row_indices, row_scores):
+                # Hits come best-first, so stop at the first one below the threshold
+                if self.score_threshold is not None and score < self.score_threshold:
+                    break
+                if 0 <= idx < len(self.vector_metadata):
+                    meta = self.vector_metadata[idx]
+                    content = f"[Source: {meta.get('source_name', 'Unknown')}] {meta.get('text', '')}"
+                    docs.append(Document(
+                        page_content=content,
+                        metadata={"type": "vector", "source": meta.get('source_name'), "score": float(score)}
+                    ))
+            results.append(docs)
+        return results
+
+    # 2. Graph Search
+    def _extract_entities(self, queries):
+        """Entity mentions per query (one nlp.pipe pass), deduplicated case-insensitively."""
+        results = []
+        with span("ner") as timing:
+            for spacy_doc in self.nlp.pipe(queries):
+                entities = {}
+                for ent in spacy_doc.ents:
+                    entities.setdefault(ent.text.lower(), ent.text)
+                results.append(list(entities.values()))
+            timing.add(len(queries))
+        return results
+
+    @staticmethod
+    def _graph_documents(entities, records):
+        """Groups facts back per entity (in query order), keeping a fact only under the first entity that found it."""
+        grouped = {entity: [] for entity in entities}
+        seen = set()
+        for record in records:
+            if record["edge_id"] in seen:
+                continue
+            seen.add(record["edge_id"])
+            fact = f"{record['source']} --[{record['rel']}]--> {record['target']}"
+            grouped.setdefault(record["entity"], []).append((fact, record["score"]))
+        return [
+            Document(page_content=fact, metadata={"type": "graph", "entity": entity, "score": float(score)})
+            for entity, facts in grouped.items()
+            for fact, score in facts
+        ]
+
+    def _lookup_params(self, entities):
+        lookups = [{"entity": e, "query": q} for e in entities if (q := entity_search_query(e))]
+        return {"lookups": lookups, "index": ENTITY_FULLTEXT_INDEX, "limit": self.top_k_graph}
+
+    def _split_by_query(self, entity_lists, records):
+        # Each distinct entity was looked up once; hand its facts to every query that mentioned it
+        by_entity = {}
+        for record in records:
+            by_entity.setdefault(record["entity"], []).append(record)
+        return [
+            self._graph_documents(entities, [r for e in entities for r in by_entity.get(e, [])])
+            for entities in entity_lists
+        ]
+
+    def _graph_search(self, entity_lists):
+        """Graph facts for each query's entities, from one Cypher call over all distinct entities."""
+        entities = list(dict.fromkeys(e for ents in entity_lists for e in ents))
+        if not entities:
+            return [[] for _ in entity_lists]
+        logger.info(f"Querying graph for {len(entities)} entities")
+        try:
+            with self.graph.session() as session, span("neo4j.query", query="entity_lookup") as timing:
+                # Use session.run with parameters (safer than f-strings)
+                records = list(session.run(ENTITY_CYPHER, self._lookup_params(entities)))
+                timing.add(len(entities))
+            logger.info("Graph search completed")
+        except Exception as e:
+            raise KGException(e,sys)
+        return self._split_by_query(entity_lists, records)
+
+    async def _agraph_search(self, queries):
+        # spaCy is CPU-bound, keep it off the event loop
+        entity_lists = await asyncio.to_thread(self._extract_entities, queries)
+        if self.async_graph is None:
+            return await asyncio.to_thread(self._graph_search, entity_lists)
+
+        entities = list(dict.fromkeys(e for ents in entity_lists for e in ents))
+        if not entities:
+            return [[] for _ in entity_lists]
+        logger.info(f"Querying graph for {len(entities)} entities")
+        try:
+            async with self.async_graph.session() as session:
+                with span("neo4j.query", query="entity_lookup") as timing:
+                    result = await session.run(ENTITY_CYPHER, self._lookup_params(entities))
+                    records = [record async for record in result]
+                    timing.add(len(entities))
+            logger.info("Graph search completed")
+        except Exception as e:
+            raise KGException(e,sys)
+        return self._split_by_query(entity_lists, records)
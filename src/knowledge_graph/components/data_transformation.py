@@ -1,9 +1,14 @@
 import spacy
 from neo4j import GraphDatabase
-from src.knowledge_graph.utils.common import read_json, write_json
+from src.knowledge_graph.utils.common import write_json, write_json_list, read_jsonl, text_hash
+from src.knowledge_graph.components.extraction_store import ExtractionStore
+from src.knowledge_graph.components.graph_loader import GraphLoader
+from src.knowledge_graph.components.provenance_store import ProvenanceStore
 from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.logger.metrics import span, timed_iter
 import re
 import itertools
+from datetime import datetime
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,16 +17,45 @@ class DataTransformation:
 
     def __init__(self, config):
         self.config = config
-        self.docs = read_json(config.input_json)
-        self.nlp = spacy.load("en_core_web_sm")
 
-        # Global storage
-        self.entities = []       # List of all entity objects
-        self.relationships = []  # Detailed relationship data
-        self.triples = []        # Simplified Subject-Verb-Object for Graph
-        
-        # Counters & Maps
-        self.entity_map = {}     # Deduplication map: "Elon Musk_PERSON" -> ID
+        # doc_id -> entities/edges as of the last graph sync, read and written per document
+        self.provenance = ProvenanceStore(config.provenance_path)
+        legacy_path = os.path.splitext(config.provenance_path)[0] + ".json"
+        if not self.provenance.exists() and legacy_path != config.provenance_path and os.path.exists(legacy_path):
+            self.provenance.import_json(legacy_path)
+
+        self.docs = self._load_documents()
+        self.nlp = self._load_nlp()
+
+        # Global storage: interned, array-backed; the dict rows below are views over it
+        self.store = ExtractionStore()
+        self.entities = self.store.entities            # Entity rows
+        self.relationships = self.store.relationships  # Detailed relationship rows
+        self.triples = self.store.triples              # Subject-Verb-Object rows for the Graph
+        self.processed_doc_ids = set()
+
+    def _load_documents(self):
+        """
+        Lazy record stream: on incremental runs only the records the graph has no
+        provenance for yet, else the full corpus. The graph's own state decides, so
+        records of a run whose sync failed are picked up by the next one.
+        """
+        self.full_rebuild = not (self.config.incremental and self.provenance.exists())
+        self.deleted_ids = []         # Synced records no longer in the corpus (known once streamed)
+        if self.full_rebuild:
+            return read_jsonl(self.config.input_records)
+        return self._unsynced_records(self.provenance.doc_ids())
+
+    def _unsynced_records(self, synced_ids):
+        current_ids, pending = set(), 0
+        for record in read_jsonl(self.config.input_records):
+            current_ids.add(record["id"])
+            if record["id"] not in synced_ids:
+                pending += 1
+                yield record
+        self.deleted_ids = sorted(synced_ids - current_ids)
+        logger.info(f"Incremental run: {pending} records not in the graph yet, "
+                    f"{len(self.deleted_ids)} synced records no longer in the corpus.")
 
     def clean_text(self, text):
         """Standardize text: 'Elon Musk ' -> 'elon musk'"""
@@ -34,158 +68,228 @@ class DataTransformation:
         clean = clean.strip().replace(" ", "_").upper()
         return clean if clean else "RELATED_TO"
 
-    # 1️⃣ ENTITY EXTRACTION
-    def extract_entities(self):
-        logger.info("1. Extracting Entities...")
-        
-        for doc in self.docs:
-            spacy_doc = self.nlp(doc["text"])
-            
-            for ent in spacy_doc.ents:
-                # Create a unique key (Text + Label) to prevent duplicates
-                clean_key = f"{self.clean_text(ent.text)}_{ent.label_}"
-                
-                # We store the "First observed" version of the entity
-                if clean_key not in self.entity_map:
-                    entity_obj = {
-                        "id": clean_key,           # ID for Neo4j
-                        "name": ent.text.strip(),  # Display Name
-                        "label": ent.label_,       # Type (PERSON, ORG)
-                        "doc_id": doc.get("id")
-                    }
-                    self.entity_map[clean_key] = entity_obj
-                    self.entities.append(entity_obj)
-
-        write_json(self.config.entities_output, self.entities)
+    def _load_nlp(self):
+        """Loads spaCy with only the components extraction actually needs."""
+        spacy_cfg = self.config.spacy
+        disable = list(spacy_cfg.disable)
+        # Dependency-path linking needs the parse tree
+        if self.config.relationships.strategy == "dependency" and "parser" in disable:
+            logger.info("Keeping the parser enabled for the dependency relationship strategy.")
+            disable.remove("parser")
+        nlp = spacy.load(spacy_cfg.model, disable=disable)
+        # Sentence boundaries normally come from the parser; use the cheaper senter instead
+        if "parser" in disable and "senter" in nlp.disabled:
+            nlp.enable_pipe("senter")
+        return nlp
+
+    def parse_documents(self):
+        """
+        Streams (spacy_doc, record) pairs from a single nlp.pipe pass over the corpus.
+        Only a sequence number travels as context (spaCy pickles contexts to the worker
+        processes and back when n_process > 1); the records in flight wait here.
+        """
+        spacy_cfg = self.config.spacy
+        in_flight = {}
+
+        def texts():
+            for position, doc in enumerate(self.docs):
+                in_flight[position] = doc
+                yield doc["text"], position
+
+        for spacy_doc, position in self.nlp.pipe(
+            texts(),
+            as_tuples=True,
+            batch_size=spacy_cfg.batch_size,
+            n_process=spacy_cfg.n_process,
+        ):
+            yield spacy_doc, in_flight.pop(position)
+
+    # 1️⃣ + 2️⃣ ENTITY & RELATIONSHIP EXTRACTION (single parse pass)
+    def extract_entities_and_relationships(self):
+        logger.info("1-2. Extracting Entities and Relationships...")
+
+        # spacy.parse is the time spent producing parsed docs (record reads + nlp.pipe); the rest is extraction
+        with span("transformation.extract") as timing:
+            for spacy_doc, doc in timed_iter(self.parse_documents(), "spacy.parse"):
+                self.processed_doc_ids.add(doc.get("id"))
+                self._extract_entities(doc, spacy_doc)
+                self._extract_relationships(doc, spacy_doc)
+                timing.add()
+
+        # Rows are rendered one at a time straight into the files
+        write_json_list(self.config.entities_output, self.entities)
         logger.info(f"Extracted {len(self.entities)} unique entities.")
+        write_json_list(self.config.relationships_output, self.relationships)
+        logger.info(f"Extracted {len(self.relationships)} relationships.")
+        write_json(self.config.sentences_output, self.store.sentence_map())
+        logger.info(f"Stored {len(self.store.sentences)} supporting sentences.")
 
-    # 2️⃣ RELATIONSHIP EXTRACTION (Co-occurrence Strategy)
-    def extract_relationships(self):
-        logger.info("2. Extracting Relationships...")
-        
-        seen_relationships = set() # To avoid duplicate A->B relations in the same sentence
+    def _extract_entities(self, doc, spacy_doc):
+        doc_code = self.store.docs.intern(doc.get("id"))
+        for ent in spacy_doc.ents:
+            # Create a unique key (Text + Label) to prevent duplicates; the store keeps the
+            # "First observed" name and every document mentioning it (provenance)
+            clean_key = f"{self.clean_text(ent.text)}_{ent.label_}"
+            self.store.add_entity(clean_key, ent.text.strip(), ent.label_, doc_code)
+
+    @staticmethod
+    def _dependency_distance(a, b):
+        """Number of arcs between two tokens in the dependency tree (inf when unconnected)."""
+        depth = {token.i: d for d, token in enumerate([a, *a.ancestors])}
+        for d, token in enumerate([b, *b.ancestors]):
+            if token.i in depth:
+                return depth[token.i] + d
+        return float("inf")
 
-        for doc in self.docs:
-            spacy_doc = self.nlp(doc["text"])
+    def _candidate_pairs(self, sent_entities):
+        """
+        Entity pairs to connect in one sentence, by relationships.strategy:
+        - all        : every pair (quadratic, the original behaviour)
+        - window     : each entity with the next `window` entities
+        - dependency : pairs whose span roots are within `max_path_length` dependency arcs
+        Capped at max_pairs_per_sentence either way.
+        """
+        rel_cfg = self.config.relationships
+        n = len(sent_entities)
+        if rel_cfg.strategy == "window":
+            pairs = ((i, j) for i in range(n) for j in range(i + 1, min(n, i + 1 + rel_cfg.window)))
+        elif rel_cfg.strategy == "dependency":
+            pairs = (
+                (i, j) for i, j in itertools.combinations(range(n), 2)
+                if self._dependency_distance(sent_entities[i][0].root, sent_entities[j][0].root) <= rel_cfg.max_path_length
+            )
+        else:
+            pairs = itertools.combinations(range(n), 2)
+        return itertools.islice(pairs, rel_cfg.max_pairs_per_sentence)
+
+    # Co-occurrence Strategy (bounded)
+    def _extract_relationships(self, doc, spacy_doc):
+        store = self.store
+        doc_code = store.docs.intern(doc.get("id"))
+        for sent in spacy_doc.sents:
+            # A. Find all entities (span + entity id) in this specific sentence
+            sent_entities = []
+            for ent in sent.ents:
+                entity = store.entity_keys.get(f"{self.clean_text(ent.text)}_{ent.label_}")
+                if entity is not None:
+                    sent_entities.append((ent, entity))
+            
+            # We need at least 2 entities to make a relationship
+            if len(sent_entities) < 2:
+                continue
             
-            for sent in spacy_doc.sents:
-                # A. Find all entities in this specific sentence
-                sent_entities = []
-                for ent in sent.ents:
-                    key = f"{self.clean_text(ent.text)}_{ent.label_}"
-                    if key in self.entity_map:
-                        sent_entities.append(self.entity_map[key])
-                
-                # We need at least 2 entities to make a relationship
-                if len(sent_entities) < 2:
+            # B. Find the "Root Verb" of the sentence (The main action)
+            root_verb = "RELATED_TO" # Default fallback
+            for token in sent:
+                if token.pos_ == "VERB":
+                    root_verb = token.lemma_
+                    break # Take the first main verb found
+            
+            relation = store.relations.intern(self.clean_relation(root_verb))
+
+            # Sentence text is stored once and referenced by id from its relationships
+            sentence_text = sent.text.strip()
+            sentence = store.add_sentence(text_hash(sentence_text), sentence_text)
+
+            # C. Connect nearby entities; a link seen again only raises its weight
+            linked = set()
+            for i, j in self._candidate_pairs(sent_entities):
+                source, target = sent_entities[i][1], sent_entities[j][1]
+
+                # Prevent self-loops (A->A)
+                if source == target:
                     continue
-                
-                # B. Find the "Root Verb" of the sentence (The main action)
-                root_verb = "RELATED_TO" # Default fallback
-                for token in sent:
-                    if token.pos_ == "VERB":
-                        root_verb = token.lemma_
-                        break # Take the first main verb found
-                
-                clean_verb = self.clean_relation(root_verb)
-
-                # C. Create Permutations (Connect every entity to every other entity)
-                # Note: This is "greedy" but ensures we don't miss connections.
-                # Combinations(2) creates pairs: (A,B), (A,C), (B,C)
-                for source, target in itertools.combinations(sent_entities, 2):
-                    
-                    # Prevent self-loops (A->A)
-                    if source["id"] == target["id"]:
-                        continue
-
-                    # Create a unique signature for this specific link
-                    rel_signature = f"{source['id']}|{clean_verb}|{target['id']}"
-                    
-                    if rel_signature not in seen_relationships:
-                        seen_relationships.add(rel_signature)
-                        
-                        self.relationships.append({
-                            "relation_id": rel_signature,
-                            "subject_id": source["id"],
-                            "subject_name": source["name"],
-                            "relation": clean_verb,
-                            "object_id": target["id"],
-                            "object_name": target["name"],
-                            "sentence": sent.text.strip(),
-                            "doc_id": doc.get("id")
-                        })
-
-        write_json(self.config.relationships_output, self.relationships)
-        logger.info(f"Extracted {len(self.relationships)} relationships.")
+
+                # Weight counts sentences, not repeated mentions within one
+                key = store.link_key(source, relation, target)
+                if key in linked:
+                    continue
+                linked.add(key)
+                store.add_link(source, relation, target, sentence, doc_code)
 
     # 3️⃣ TRIPLE CREATION
     def create_triples(self):
         logger.info("3. Creating Triples...")
         
-        # Convert detailed relationships into simple triples for Graph
-        for rel in self.relationships:
-            self.triples.append({
-                "head_id": rel["subject_id"],
-                "head_name": rel["subject_name"],
-                "relation": rel["relation"],
-                "tail_id": rel["object_id"],
-                "tail_name": rel["object_name"]
-            })
-            
-        write_json(self.config.triples_output, self.triples)
+        # Triples are a view over the relationship columns, nothing is copied
+        write_json_list(self.config.triples_output, self.triples)
         logger.info(f"Generated {len(self.triples)} triples ready for Neo4j.")
 
-    # 4️⃣ GRAPH CONSTRUCTION (Optimized Batch)
+    # 4️⃣ GRAPH CONSTRUCTION (Diff-based sync)
+    def _provenance(self):
+        """doc_id -> entity ids and [head_id, relation, tail_id, co-occurrences] edges extracted from it in this run."""
+        return self.store.provenance(self.processed_doc_ids)
+
+    def _graph_diff(self):
+        """
+        Compares this run's provenance with the last synced one. Returns this run's
+        provenance, the documents to drop from the store, and what to retract (entity or
+        edge -> doc ids): items of deleted documents, and items a
+        re-processed document no longer yields. Only the touched documents are read.
+        """
+        current = self._provenance()
+        if self.full_rebuild:
+            gone = self.provenance.doc_ids() - self.processed_doc_ids
+        else:
+            gone = set(self.deleted_ids)
+        previous = self.provenance.get(gone | self.processed_doc_ids)
+        gone &= set(previous)
+
+        empty = {"entities": [], "edges": []}
+        entity_retractions, edge_retractions = {}, {}
+        for doc_id, old in previous.items():
+            new = current.get(doc_id, empty)
+            for entity_id in set(old["entities"]) - set(new["entities"]):
+                entity_retractions.setdefault(entity_id, []).append(doc_id)
+            new_edges = {tuple(edge[:3]) for edge in new["edges"]}
+            for edge in old["edges"]:
+                key = tuple(edge[:3])
+                if key in new_edges:
+                    continue
+                edge_retractions.setdefault(key, []).append(doc_id)
+
+        logger.info(f"Graph diff: {len(gone)} documents removed, {len(entity_retractions)} entities "
+                    f"and {len(edge_retractions)} edges to retract")
+        return current, gone, entity_retractions, edge_retractions
+
     def build_graph(self):
-        logger.info("4. Building Graph in Neo4j...")
+        loader = self.config.graph_loader
+        if loader.mode == "csv":
+            logger.info("4. Writing neo4j-admin import files...")
+            if not self.full_rebuild:
+                logger.warning("CSV import is for initial loads; these files only hold this run's delta.")
+            command = GraphLoader.write_import_csvs(loader.csv_dir, self.entities, self.triples)
+            if self.full_rebuild:
+                self.provenance.write(self._provenance(), clear=True)
+            logger.info(f"Stop Neo4j and run: {command}")
+            return
+
+        logger.info("4. Syncing Graph in Neo4j...")
+        provenance, gone, entity_retractions, edge_retractions = self._graph_diff()
         neo = self.config
         driver = GraphDatabase.driver(
             os.getenv("NEO_4J_URI"), 
-            auth=(neo.neo4j_username, os.getenv("PASSWORD"))
+            auth=(neo.neo4j_username, os.getenv("PASSWORD")),
+            max_transaction_retry_time=loader.max_retry_time
         )
+        try:
+            graph = GraphLoader(driver, loader.batch_size, loader.num_workers)
+            # Retract first: an entity emptied here and re-mentioned below is simply re-created
+            graph.retract(entity_retractions, edge_retractions)
+            # A full rebuild carries every document of an edge; an incremental run upserts its own
+            graph.load(self.entities, self.triples, replace_weights=self.full_rebuild)
+            if self.full_rebuild:
+                # Also sweeps nodes/edges written before provenance was tracked
+                graph.collect_garbage()
+        finally:
+            driver.close()
 
-        with driver.session() as session:
-            # 1. Unique Constraints
-            try:
-                session.run("CREATE CONSTRAINT FOR (n:Entity) REQUIRE n.id IS UNIQUE")
-            except Exception:
-                pass
-
-            # 2. Batch Insert Entities
-            logger.info("Batch Inserting Entities...")
-            entity_query = """
-            UNWIND $batch AS row
-            MERGE (e:Entity {id: row.id})
-            SET e.name = row.name, 
-                e.type = row.label
-            """
-            self._batch_run(session, entity_query, self.entities)
-
-            # 3. Batch Insert Relationships
-            logger.info("Batch Inserting Relationships...")
-            
-            # Group by Verb to optimize Cypher (e.g., insert all WORKS_AT together)
-            triples_by_type = {}
-            for t in self.triples:
-                r_type = t["relation"]
-                if r_type not in triples_by_type: triples_by_type[r_type] = []
-                triples_by_type[r_type].append(t)
-
-            for rel_type, batch_data in triples_by_type.items():
-                # F-String is safe here because rel_type is sanitized in extract_relationships
-                rel_query = f"""
-                UNWIND $batch AS row
-                MATCH (h:Entity {{id: row.head_id}})
-                MATCH (t:Entity {{id: row.tail_id}})
-                MERGE (h)-[:{rel_type}]->(t)
-                """
-                self._batch_run(session, rel_query, batch_data)
-
+        # Only a completed sync becomes the baseline for the next diff
+        self.provenance.write(provenance, removed=gone)
+        # Bump the graph version so answers cached against the old graph are dropped
+        write_json(self.config.graph_version_path, {
+            "built_at": datetime.now().isoformat(),
+            "entities": len(self.entities),
+            "triples": len(self.triples)
+        })
         logger.info("Graph Construction Completed Successfully.")
-
-    def _batch_run(self, session, query, data, batch_size=1000):
-        """Helper to run queries in chunks"""
-        total = len(data)
-        for i in range(0, total, batch_size):
-            batch = data[i:i+batch_size]
-            session.run(query, batch=batch)
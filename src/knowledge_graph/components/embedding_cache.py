@@ -0,0 +1,134 @@
+import os
+import re
+import json
+import numpy as np
+
+from src.knowledge_graph.utils.common import text_hash
+from src.knowledge_graph.logger.logging import logger
+
+# Keys are 16-character text hashes, stored as fixed-width bytes
+_KEY_WIDTH = 16
+_KEY_DTYPE = f"S{_KEY_WIDTH}"
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model name, normalized chunk text hash).
+
+    Layout (one directory per model):
+    - vectors.bin : append-only row-major matrix (float16/float32), read through np.memmap
+    - keys.bin    : append-only fixed-width text hash of every row, in row order
+    - meta.json   : model name, dimension, dtype and the committed row count
+
+    Each group of new rows is appended to both files before meta.json is replaced, so
+    the count in meta.json is the commit point: rows past it (an interrupted append)
+    are truncated away when the cache is opened.
+    """
+
+    def __init__(self, cache_dir, model_name, dim, dtype="float16"):
+        slug = re.sub(r"[^a-zA-Z0-9_.-]+", "_", model_name)
+        self.dir = os.path.join(cache_dir, slug)
+        self.model_name = model_name
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+
+        self.vectors_path = os.path.join(self.dir, "vectors.bin")
+        self.keys_path = os.path.join(self.dir, "keys.bin")
+        self.legacy_keys_path = os.path.join(self.dir, "keys.npy")
+        self.meta_path = os.path.join(self.dir, "meta.json")
+
+        self.keys = []
+        self.rows = {}
+        self._load()
+
+    @staticmethod
+    def normalize(text):
+        """Whitespace-insensitive form of a chunk, so re-wrapped text still hits the cache."""
+        return " ".join(text.split())
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            # Nothing was committed: rows left by an interrupted first append are discarded
+            for path in (self.vectors_path, self.keys_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        with open(self.meta_path) as f:
+            meta = json.load(f)
+        if meta["dim"] != self.dim or meta["dtype"] != self.dtype.name:
+            logger.warning(f"Embedding cache at {self.dir} has a different layout, starting fresh.")
+            for path in (self.vectors_path, self.keys_path, self.legacy_keys_path, self.meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        if "count" not in meta:
+            self._migrate_legacy_keys()
+            return
+
+        count = meta["count"]
+        # Drop rows appended after the last commit so both files line up with the count again
+        for path, row_size in ((self.keys_path, _KEY_WIDTH), (self.vectors_path, self.dim * self.dtype.itemsize)):
+            with open(path, "ab") as f:
+                f.truncate(count * row_size)
+        self.keys = np.fromfile(self.keys_path, dtype=_KEY_DTYPE, count=count).astype(str).tolist()
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        logger.info(f"Loaded embedding cache with {len(self.keys)} vectors from {self.dir}")
+
+    def _migrate_legacy_keys(self):
+        """One-off conversion of the keys.npy index earlier versions rewrote on every append."""
+        self.keys = np.load(self.legacy_keys_path).astype(str).tolist()
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        with open(self.keys_path, "wb") as f:
+            f.write(np.array(self.keys, dtype=_KEY_DTYPE).tobytes())
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(len(self.keys) * self.dim * self.dtype.itemsize)
+        self._commit()
+        os.remove(self.legacy_keys_path)
+        logger.info(f"Migrated embedding cache keys at {self.dir} to {os.path.basename(self.keys_path)}")
+
+    def _commit(self):
+        """Atomically records the current row count in meta.json."""
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"model_name": self.model_name, "dim": self.dim, "dtype": self.dtype.name,
+                       "count": len(self.keys)}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def _matrix(self):
+        if not self.keys:
+            return np.empty((0, self.dim), dtype=self.dtype)
+        return np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(len(self.keys), self.dim))
+
+    def encode(self, texts, encode_fn):
+        """
+        Returns float32 embeddings for `texts`, calling `encode_fn` only for cache misses
+        (each distinct text once). New vectors are appended to the cache and persisted.
+        """
+        keys = [text_hash(self.normalize(t)) for t in texts]
+
+        misses = {}
+        for position, key in enumerate(keys):
+            if key not in self.rows and key not in misses:
+                misses[key] = position
+        logger.info(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+
+        if misses:
+            new_vectors = np.asarray(encode_fn([texts[p] for p in misses.values()]), dtype=np.float32)
+            self._append(list(misses), new_vectors)
+
+        matrix = self._matrix()
+        return np.asarray(matrix[[self.rows[key] for key in keys]], dtype=np.float32).reshape(len(keys), self.dim)
+
+    def _append(self, keys, vectors):
+        os.makedirs(self.dir, exist_ok=True)
+        # Only the new rows are written; both files already end at the committed count
+        with open(self.vectors_path, "ab") as f:
+            f.write(vectors.astype(self.dtype).tobytes())
+        with open(self.keys_path, "ab") as f:
+            f.write(np.array(keys, dtype=_KEY_DTYPE).tobytes())
+
+        for key in keys:
+            self.rows[key] = len(self.keys)
+            self.keys.append(key)
+        self._commit()
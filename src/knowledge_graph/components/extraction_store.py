@@ -0,0 +1,244 @@
+from abc import ABC, abstractmethod
+from array import array
+from collections.abc import Sequence
+
+
+class Interner:
+    """Maps strings to dense ints and back, so each distinct string is stored once."""
+    __slots__ = ("ids", "values")
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, code):
+        return self.values[code]
+
+    def intern(self, value):
+        code = self.ids.get(value)
+        if code is None:
+            code = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def get(self, value):
+        return self.ids.get(value)
+
+
+class _RowView(Sequence, ABC):
+    """Read-only sequence of dict rows rendered on access from the store's columns."""
+    __slots__ = ("store", "rows")
+
+    def __init__(self, store, rows=None):
+        self.store = store
+        self.rows = rows          # Optional subset of row numbers (e.g. one relation type)
+
+    @abstractmethod
+    def _count(self):
+        """Number of rows in the whole store."""
+
+    @abstractmethod
+    def _row(self, i):
+        """Dict rendering of row number i."""
+
+    def __len__(self):
+        return self._count() if self.rows is None else len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._row(i if self.rows is None else self.rows[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i if self.rows is None else self.rows[i])
+
+
+class EntityView(_RowView):
+    __slots__ = ()
+
+    def _count(self):
+        return len(self.store.entity_keys)
+
+    def _row(self, i):
+        s = self.store
+        doc_ids = [s.docs[d] for d in s.entity_docs[i]]
+        return {
+            "id": s.entity_keys[i],
+            "name": s.entity_names[i],
+            "label": s.labels[s.entity_labels[i]],
+            "doc_id": doc_ids[0],
+            "doc_ids": doc_ids,
+        }
+
+
+class RelationshipView(_RowView):
+    __slots__ = ()
+
+    def _count(self):
+        return len(self.store.rel_types)
+
+    def _row(self, i):
+        s = self.store
+        head, tail, relation = s.rel_heads[i], s.rel_tails[i], s.relations[s.rel_types[i]]
+        doc_ids = [s.docs[d] for d in s.rel_docs[i]]
+        return {
+            "relation_id": f"{s.entity_keys[head]}|{relation}|{s.entity_keys[tail]}",
+            "subject_id": s.entity_keys[head],
+            "subject_name": s.entity_names[head],
+            "relation": relation,
+            "object_id": s.entity_keys[tail],
+            "object_name": s.entity_names[tail],
+            "sentence_id": s.sentences[s.rel_sentences[i]],
+            "doc_id": doc_ids[0],
+            "weight": s.rel_weights[i],
+            "doc_ids": doc_ids,
+            "doc_weights": s.rel_doc_weights[i].tolist(),
+        }
+
+
+class TripleView(_RowView):
+    """Head/relation/tail rows for the graph loader, rendered from the relationship columns."""
+    __slots__ = ()
+
+    def _count(self):
+        return len(self.store.rel_types)
+
+    def _row(self, i):
+        s = self.store
+        head, tail = s.rel_heads[i], s.rel_tails[i]
+        return {
+            "head_id": s.entity_keys[head],
+            "head_name": s.entity_names[head],
+            "relation": s.relations[s.rel_types[i]],
+            "tail_id": s.entity_keys[tail],
+            "tail_name": s.entity_names[tail],
+            "weight": s.rel_weights[i],
+            "doc_ids": [s.docs[d] for d in s.rel_docs[i]],
+            "doc_weights": s.rel_doc_weights[i].tolist(),
+        }
+
+    def endpoints(self):
+        """(head, tail) entity ids per row, without rendering the rows."""
+        s = self.store
+        for i in (range(len(s.rel_types)) if self.rows is None else self.rows):
+            yield s.rel_heads[i], s.rel_tails[i]
+
+    def by_relation(self):
+        """{relation type: TripleView of its rows}, sharing this store (no row copies)."""
+        s = self.store
+        groups = {}
+        for i in (range(len(s.rel_types)) if self.rows is None else self.rows):
+            groups.setdefault(s.rel_types[i], array("l")).append(i)
+        return {s.relations[code]: TripleView(s, rows) for code, rows in groups.items()}
+
+
+class ExtractionStore:
+    """
+    Columnar store for extracted entities and co-occurrence relationships.
+
+    Entities and relationships are dense integer ids; entity keys, names, labels,
+    relation types, document ids and sentence ids are interned once, and numeric
+    columns are compact `array`s. The dict rows the JSON artifacts and the graph
+    loader expect are only rendered through the views.
+    """
+
+    def __init__(self):
+        self.docs = Interner()            # record id -> doc code
+        self.labels = Interner()          # PERSON, ORG, ...
+        self.relations = Interner()       # relation types
+        self.sentences = Interner()       # sentence id (text hash) -> sentence code
+        self.sentence_texts = []          # by sentence code
+
+        # Entities, by entity id
+        self.entity_keys = Interner()     # "elon musk_PERSON" -> entity id
+        self.entity_names = []            # First observed display name
+        self.entity_labels = array("l")
+        self.entity_docs = []             # array of doc codes per entity, in first-seen order
+
+        # Relationships, by relationship id
+        self.rel_index = {}               # packed (head, tail, relation) -> relationship id
+        self.rel_heads = array("l")
+        self.rel_tails = array("l")
+        self.rel_types = array("l")
+        self.rel_weights = array("q")     # Co-occurrence count
+        self.rel_sentences = array("l")   # First supporting sentence
+        self.rel_docs = []                # array of doc codes per relationship
+        self.rel_doc_weights = []         # array of co-occurrences per entry of rel_docs
+
+        self.entities = EntityView(self)
+        self.relationships = RelationshipView(self)
+        self.triples = TripleView(self)
+
+    @staticmethod
+    def _add_doc(docs, doc):
+        # Documents are processed one at a time, so repeats of the same doc are always the last entry
+        if docs[-1] != doc:
+            docs.append(doc)
+            return True
+        return False
+
+    def add_entity(self, key, name, label, doc):
+        """Records a mention of `key` in doc code `doc` and returns the entity id."""
+        entity = self.entity_keys.get(key)
+        if entity is None:
+            entity = self.entity_keys.intern(key)
+            self.entity_names.append(name)
+            self.entity_labels.append(self.labels.intern(label))
+            self.entity_docs.append(array("l", [doc]))
+        else:
+            self._add_doc(self.entity_docs[entity], doc)
+        return entity
+
+    def add_sentence(self, sentence_id, text):
+        code = self.sentences.get(sentence_id)
+        if code is None:
+            code = self.sentences.intern(sentence_id)
+            self.sentence_texts.append(text)
+        return code
+
+    @staticmethod
+    def link_key(head, relation, tail):
+        return (head << 64) | (tail << 32) | relation
+
+    def add_link(self, head, relation, tail, sentence, doc):
+        """Counts one co-occurrence of head -[relation]-> tail in doc code `doc`."""
+        key = self.link_key(head, relation, tail)
+        rel = self.rel_index.get(key)
+        if rel is None:
+            rel = self.rel_index[key] = len(self.rel_types)
+            self.rel_heads.append(head)
+            self.rel_tails.append(tail)
+            self.rel_types.append(relation)
+            self.rel_weights.append(0)
+            self.rel_sentences.append(sentence)
+            self.rel_docs.append(array("l", [doc]))
+            self.rel_doc_weights.append(array("l", [0]))
+        elif self._add_doc(self.rel_docs[rel], doc):
+            self.rel_doc_weights[rel].append(0)
+        self.rel_weights[rel] += 1
+        self.rel_doc_weights[rel][-1] += 1
+
+    def sentence_map(self):
+        return dict(zip(self.sentences.values, self.sentence_texts))
+
+    def provenance(self, doc_ids):
+        """doc_id -> entity keys and [head, relation, tail, co-occurrences] edges, for the given documents."""
+        provenance = {doc_id: {"entities": [], "edges": []} for doc_id in doc_ids}
+        for entity, docs in enumerate(self.entity_docs):
+            key = self.entity_keys[entity]
+            for doc in docs:
+                provenance[self.docs[doc]]["entities"].append(key)
+        for rel, docs in enumerate(self.rel_docs):
+            edge = [self.entity_keys[self.rel_heads[rel]], self.relations[self.rel_types[rel]],
+                    self.entity_keys[self.rel_tails[rel]]]
+            for doc, weight in zip(docs, self.rel_doc_weights[rel]):
+                provenance[self.docs[doc]]["edges"].append(edge + [weight])
+        return provenance
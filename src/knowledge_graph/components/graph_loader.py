@@ -0,0 +1,242 @@
+import os
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+from src.knowledge_graph.components.graph_schema import ensure_entity_indexes
+from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.logger.metrics import span
+
+# doc_ids holds the provenance of every node/edge; writes union into it, retractions remove from it
+ENTITY_QUERY = """
+UNWIND $batch AS row
+MERGE (e:Entity {id: row.id})
+SET e.name = row.name,
+    e.type = row.label,
+    e.doc_ids = coalesce(e.doc_ids, []) + [d IN row.doc_ids WHERE NOT d IN coalesce(e.doc_ids, [])]
+"""
+
+# {rel_type} is substituted in; safe because rel_type is sanitized in extract_relationships.
+# Edges keep each document's co-occurrence count in doc_weights (parallel to doc_ids) and
+# weight is recomputed as their sum, so re-sending a document (e.g. a retried sync) replaces
+# its entry instead of counting it twice. {kept} picks the positions of the entries to keep.
+RELATIONSHIP_QUERY = """
+UNWIND $batch AS row
+MATCH (h:Entity {id: row.head_id})
+MATCH (t:Entity {id: row.tail_id})
+MERGE (h)-[r:{rel_type}]->(t)
+WITH r, row, {kept} AS kept
+WITH r, [i IN kept | r.doc_ids[i]] + row.doc_ids AS doc_ids,
+     [i IN kept | coalesce(r.doc_weights[i], 1)] + row.doc_weights AS doc_weights
+SET r.doc_ids = doc_ids,
+    r.doc_weights = doc_weights,
+    r.weight = reduce(total = 0, w IN doc_weights | total + w)
+"""
+
+# Full rebuilds send every document of an edge, so its lists are replaced outright;
+# incremental runs keep the entries of documents they did not touch
+REPLACE_DOCS = "[]"
+UPSERT_DOCS = "[i IN range(0, size(coalesce(r.doc_ids, [])) - 1) WHERE NOT r.doc_ids[i] IN row.doc_ids]"
+
+# Edges written before doc_weights existed count each of their documents once
+RETRACT_RELATIONSHIP_QUERY = """
+UNWIND $batch AS row
+MATCH (h:Entity {id: row.head_id})-[r:{rel_type}]->(t:Entity {id: row.tail_id})
+WITH r, [i IN range(0, size(coalesce(r.doc_ids, [])) - 1) WHERE NOT r.doc_ids[i] IN row.doc_ids] AS kept
+WITH r, [i IN kept | r.doc_ids[i]] AS doc_ids, [i IN kept | coalesce(r.doc_weights[i], 1)] AS doc_weights
+SET r.doc_ids = doc_ids,
+    r.doc_weights = doc_weights,
+    r.weight = reduce(total = 0, w IN doc_weights | total + w)
+WITH r WHERE size(r.doc_ids) = 0
+DELETE r
+"""
+
+# An entity no document mentions is an orphan; its edges are necessarily unreferenced too
+RETRACT_ENTITY_QUERY = """
+UNWIND $batch AS row
+MATCH (e:Entity {id: row.id})
+SET e.doc_ids = [d IN coalesce(e.doc_ids, []) WHERE NOT d IN row.doc_ids]
+WITH e WHERE size(e.doc_ids) = 0
+DETACH DELETE e
+"""
+
+# Full rebuilds only: anything without provenance predates it or was emptied out
+GARBAGE_QUERIES = (
+    """
+    MATCH (:Entity)-[r]->(:Entity) WHERE r.doc_ids IS NULL OR size(r.doc_ids) = 0
+    CALL { WITH r DELETE r } IN TRANSACTIONS OF 10000 ROWS
+    """,
+    """
+    MATCH (e:Entity) WHERE e.doc_ids IS NULL OR size(e.doc_ids) = 0
+    CALL { WITH e DETACH DELETE e } IN TRANSACTIONS OF 10000 ROWS
+    """,
+)
+
+
+def _write_batch(tx, query, batch):
+    tx.run(query, batch=batch).consume()
+
+
+class GraphLoader:
+    """
+    Bulk loader for entities and triples.
+
+    Every batch is a managed write transaction (session.execute_write), so transient
+    failures such as deadlocks or leader switches are retried by the driver. MERGE of a
+    relationship locks both end nodes, so relationship types are only written in parallel
+    when they touch disjoint sets of entities; types that share entities (e.g. a hub that
+    appears under several verbs) are written one after another in the same session.
+    """
+
+    def __init__(self, driver, batch_size=5000, num_workers=4):
+        self.driver = driver
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+
+    def _write_batches(self, session, query, rows, name):
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            # One span per transaction, retries included
+            with span("neo4j.query", query=name) as timing:
+                session.execute_write(_write_batch, query, batch)
+                timing.add(len(batch))
+
+    def load_entities(self, entities):
+        logger.info(f"Batch Inserting {len(entities)} Entities...")
+        with self.driver.session() as session:
+            # Unique constraint first, so the MERGE/MATCH by id below is index-backed
+            ensure_entity_indexes(session)
+            self._write_batches(session, ENTITY_QUERY, entities, "merge_entities")
+
+    def _write_relationship_types(self, query, name, group):
+        with self.driver.session() as session:
+            for rel_type, rows in group:
+                self._write_batches(session, query.replace("{rel_type}", rel_type), rows, name)
+        return [(rel_type, len(rows)) for rel_type, rows in group]
+
+    @staticmethod
+    def _group_by_relation(triples):
+        # Store-backed triple views group by row number, without rendering any rows
+        if hasattr(triples, "by_relation"):
+            return triples.by_relation()
+        grouped = {}
+        for t in triples:
+            grouped.setdefault(t["relation"], []).append(t)
+        return grouped
+
+    @staticmethod
+    def _endpoints(rows):
+        if hasattr(rows, "endpoints"):
+            return rows.endpoints()
+        return ((row["head_id"], row["tail_id"]) for row in rows)
+
+    def _lock_groups(self, triples_by_type):
+        """
+        Partitions relationship types into groups whose batches can never wait on each
+        other's node locks: two types land in the same group when they share an entity.
+        """
+        parent = {rel_type: rel_type for rel_type in triples_by_type}
+
+        def find(rel_type):
+            while parent[rel_type] != rel_type:
+                parent[rel_type] = parent[parent[rel_type]]
+                rel_type = parent[rel_type]
+            return rel_type
+
+        owner = {}    # entity -> first relationship type seen touching it
+        for rel_type, rows in triples_by_type.items():
+            for head, tail in self._endpoints(rows):
+                for node in (head, tail):
+                    other = owner.setdefault(node, rel_type)
+                    if other != rel_type:
+                        parent[find(other)] = find(rel_type)
+
+        groups = {}
+        for rel_type, rows in triples_by_type.items():
+            groups.setdefault(find(rel_type), []).append((rel_type, rows))
+        # Largest groups first so the long ones do not end up running alone at the end
+        return sorted(groups.values(), key=lambda group: sum(len(rows) for _, rows in group), reverse=True)
+
+    def _write_relationships(self, query, name, triples):
+        # Group by Verb to optimize Cypher (e.g., insert all WORKS_AT together)
+        triples_by_type = self._group_by_relation(triples)
+        if not triples_by_type:
+            return
+
+        groups = self._lock_groups(triples_by_type) if self.num_workers > 1 else [list(triples_by_type.items())]
+        if len(groups) < len(triples_by_type):
+            logger.info(f"{len(triples_by_type)} relationship types share entities, "
+                        f"writing them as {len(groups)} independent groups")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.num_workers, len(groups)))) as pool:
+            for written in pool.map(lambda group: self._write_relationship_types(query, name, group), groups):
+                for rel_type, count in written:
+                    logger.info(f"Wrote {count} {rel_type} relationships")
+
+    def load_relationships(self, triples, replace_weights=False):
+        logger.info(f"Batch Inserting {len(triples)} Relationships...")
+        kept = REPLACE_DOCS if replace_weights else UPSERT_DOCS
+        self._write_relationships(RELATIONSHIP_QUERY.replace("{kept}", kept), "merge_relationships", triples)
+
+    def load(self, entities, triples, replace_weights=False):
+        self.load_entities(entities)
+        self.load_relationships(triples, replace_weights)
+
+    def retract(self, entity_retractions, edge_retractions):
+        """
+        Removes document ids from the provenance of the given entities ({id: doc_ids}) and
+        edges ({(head_id, relation, tail_id): doc_ids}), together with the edges' per-document
+        weights; whatever ends up with no documents is deleted. Only the listed nodes/edges
+        are touched, and documents already removed are skipped, so a retry changes nothing.
+        """
+        if edge_retractions:
+            logger.info(f"Retracting {len(edge_retractions)} Relationships...")
+            rows = [
+                {"head_id": head, "relation": rel, "tail_id": tail, "doc_ids": doc_ids}
+                for (head, rel, tail), doc_ids in edge_retractions.items()
+            ]
+            self._write_relationships(RETRACT_RELATIONSHIP_QUERY, "retract_relationships", rows)
+        if entity_retractions:
+            logger.info(f"Retracting {len(entity_retractions)} Entities...")
+            rows = [{"id": entity_id, "doc_ids": doc_ids} for entity_id, doc_ids in entity_retractions.items()]
+            with self.driver.session() as session:
+                self._write_batches(session, RETRACT_ENTITY_QUERY, rows, "retract_entities")
+
+    def collect_garbage(self):
+        logger.info("Collecting nodes and edges without provenance...")
+        with self.driver.session() as session:
+            # CALL ... IN TRANSACTIONS needs an auto-commit transaction
+            for query in GARBAGE_QUERIES:
+                with span("neo4j.query", query="collect_garbage"):
+                    session.run(query).consume()
+
+    @staticmethod
+    def write_import_csvs(csv_dir, entities, triples):
+        """
+        Writes entities/relationships as neo4j-admin import files, for initial loads into an
+        empty database (bypasses transactions entirely). Returns the import command to run.
+        """
+        os.makedirs(csv_dir, exist_ok=True)
+        nodes_path = os.path.join(csv_dir, "entities.csv")
+        rels_path = os.path.join(csv_dir, "relationships.csv")
+
+        with open(nodes_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["id:ID(Entity)", "name", "type", "doc_ids:string[]", ":LABEL"])
+            for e in entities:
+                writer.writerow([e["id"], e["name"], e["label"], ";".join(e["doc_ids"]), "Entity"])
+
+        with open(rels_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([":START_ID(Entity)", ":END_ID(Entity)", "weight:int", "doc_ids:string[]",
+                             "doc_weights:int[]", ":TYPE"])
+            for t in triples:
+                writer.writerow([t["head_id"], t["tail_id"], t["weight"], ";".join(t["doc_ids"]),
+                                 ";".join(map(str, t["doc_weights"])), t["relation"]])
+
+        command = (
+            "neo4j-admin database import full "
+            f"--nodes={os.path.abspath(nodes_path)} "
+            f"--relationships={os.path.abspath(rels_path)} "
+            "--overwrite-destination neo4j"
+        )
+        logger.info(f"Wrote {len(entities)} entities and {len(triples)} relationships to {csv_dir}")
+        return command
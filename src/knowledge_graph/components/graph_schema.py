@@ -0,0 +1,36 @@
+import re
+
+from src.knowledge_graph.logger.logging import logger
+
+# Lucene full-text index over entity names, used by the retriever for fuzzy/prefix lookup
+ENTITY_FULLTEXT_INDEX = "entity_name_fulltext"
+
+SCHEMA_STATEMENTS = (
+    "CREATE CONSTRAINT entity_id_unique IF NOT EXISTS FOR (n:Entity) REQUIRE n.id IS UNIQUE",
+    f"CREATE FULLTEXT INDEX {ENTITY_FULLTEXT_INDEX} IF NOT EXISTS FOR (n:Entity) ON EACH [n.name]",
+)
+
+
+def ensure_entity_indexes(session):
+    """Creates the entity constraint and name index if missing (idempotent; Neo4j fills new indexes in the background)."""
+    for statement in SCHEMA_STATEMENTS:
+        try:
+            session.run(statement).consume()
+        except Exception as e:
+            # e.g. an equivalent constraint created before this one had a name
+            logger.warning(f"Skipping schema statement ({e.__class__.__name__}): {statement}")
+
+
+def entity_search_query(name):
+    """
+    Lucene query for one entity mention: the exact phrase ranks highest, otherwise every
+    token must match exactly, by prefix, or (for longer tokens) within one edit.
+    Returns None when the mention has no searchable tokens.
+    """
+    # Word tokens only, so nothing needs Lucene escaping; lowercase keeps AND/OR/NOT literal
+    tokens = re.findall(r"\w+", name.lower())
+    if not tokens:
+        return None
+    terms = [f"({t} OR {t}* OR {t}~1)" if len(t) >= 4 else f"({t} OR {t}*)" for t in tokens]
+    phrase = " ".join(tokens)
+    return f"\"{phrase}\"^3 OR ({' AND '.join(terms)})"
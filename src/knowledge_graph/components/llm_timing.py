@@ -0,0 +1,36 @@
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from src.knowledge_graph.logger.metrics import observe_span, SPAN_ERRORS
+
+
+class LLMTimingHandler(BaseCallbackHandler):
+    """
+    Records llm.generate (request to last token) and llm.first_token spans for every
+    LLM call, whether the chain is invoked, batched or streamed.
+    """
+    def __init__(self, model):
+        self.model = model
+        self.started = {}      # run_id -> [start, first token seen]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self.started[run_id] = [time.perf_counter(), False]
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.started[run_id] = [time.perf_counter(), False]
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        started = self.started.get(run_id)
+        if started and not started[1]:
+            started[1] = True
+            observe_span("llm.first_token", time.perf_counter() - started[0], model=self.model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self.started.pop(run_id, None)
+        if started:
+            observe_span("llm.generate", time.perf_counter() - started[0], 1, model=self.model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self.started.pop(run_id, None)
+        SPAN_ERRORS.inc(span="llm.generate", model=self.model)
@@ -0,0 +1,210 @@
+import os
+import json
+import shutil
+from array import array
+import numpy as np
+
+from src.knowledge_graph.logger.logging import logger
+
+
+class ChunkMetadataStore:
+    """
+    Read-only, memory-mapped chunk metadata where row i describes vector i.
+
+    Layout of the store directory:
+    - text.bin          : UTF-8 chunk texts back to back
+    - text_offsets.npy  : int64 byte offsets into text.bin (n + 1 entries)
+    - document_id.npy   : fixed-width bytes column
+    - created_at.npy    : fixed-width bytes column
+    - source_name.npy / source_type.npy : int32 codes into the categories in columns.json
+
+    Nothing is decoded until a row is requested, so opening is O(1) in corpus size and
+    the pages are shared between processes through the OS page cache.
+    """
+
+    CATEGORICAL = ("source_name", "source_type")
+    FIXED = ("document_id", "created_at")
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "columns.json")) as f:
+            columns = json.load(f)
+        self.count = columns["count"]
+        self.categories = {name: columns[name] for name in self.CATEGORICAL}
+
+        self.offsets = np.load(os.path.join(path, "text_offsets.npy"), mmap_mode="r")
+        text_path = os.path.join(path, "text.bin")
+        if os.path.getsize(text_path) > 0:
+            self.text = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            self.text = np.empty(0, dtype=np.uint8)
+        self.columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in self.CATEGORICAL + self.FIXED
+        }
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, "columns.json"))
+
+    @classmethod
+    def migrate_legacy(cls, path):
+        """
+        Converts the metadata.json list earlier versions wrote next to `path` (e.g.
+        artifacts/embeddings/metadata.json for artifacts/embeddings/metadata) into a store
+        at `path`, once. Returns whether a conversion happened.
+        """
+        legacy_path = f"{path}.json"
+        if cls.exists(path) or not os.path.exists(legacy_path):
+            return False
+        with open(legacy_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        # List position i already describes vector i
+        cls.write(path, metadata)
+        logger.info(f"Converted {len(metadata)} chunk metadata rows from {legacy_path} to {path}")
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def document_ids(self):
+        """Distinct record ids that have vectors, read from the raw column."""
+        return {value.decode("utf-8") for value in np.unique(self.columns["document_id"]) if value}
+
+    def text_at(self, i):
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.text[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        row = {"id": int(i)}
+        for name in self.FIXED:
+            row[name] = self.columns[name][i].decode("utf-8") or None
+        for name in self.CATEGORICAL:
+            row[name] = self.categories[name][int(self.columns[name][i])]
+        row["text"] = self.text_at(i)
+        return row
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    @classmethod
+    def write(cls, path, metadata):
+        """Writes a list of chunk metadata dicts (in vector order) as a new store at `path`."""
+        with ChunkMetadataWriter(path) as writer:
+            for meta in metadata:
+                writer.append(meta.get("document_id"), meta.get("source_name"), meta.get("source_type"),
+                              meta.get("text"), meta.get("created_at"))
+
+
+class ChunkMetadataWriter:
+    """
+    Streams rows into a new ChunkMetadataStore at `path`: texts go straight to disk, only the
+    small per-row columns are buffered. The store is built in a per-process `path`.tmp<pid>
+    directory and swapped in when the `with` block exits cleanly, so a failed run leaves the
+    previous store untouched. Files that must go live with the store (the FAISS index whose
+    vector i row i describes) are written to `stage` paths and swapped in in the same step.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = f"{path}.tmp{os.getpid()}"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+        self.text_file = open(os.path.join(self.tmp_path, "text.bin"), "wb")
+        self.offsets = array("q", [0])
+        self.fixed = {name: [] for name in ChunkMetadataStore.FIXED}
+        self.lookups = {name: {} for name in ChunkMetadataStore.CATEGORICAL}
+        self.codes = {name: array("i") for name in ChunkMetadataStore.CATEGORICAL}
+        # (staged path, final path) of companion files, replaced right after the store
+        self.staged = []
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.text_file.close()
+            shutil.rmtree(self.tmp_path, ignore_errors=True)
+            for staged_path, _ in self.staged:
+                if os.path.exists(staged_path):
+                    os.remove(staged_path)
+        return False
+
+    def stage(self, final_path):
+        """Temporary path to write `final_path` to; it replaces `final_path` when the store is swapped in."""
+        staged_path = f"{final_path}.tmp{os.getpid()}"
+        self.staged.append((staged_path, final_path))
+        return staged_path
+
+    def _append_encoded(self, text, fixed, categorical):
+        self.text_file.write(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+        for name, value in zip(ChunkMetadataStore.FIXED, fixed):
+            self.fixed[name].append(value)
+        for name, value in zip(ChunkMetadataStore.CATEGORICAL, categorical):
+            lookup = self.lookups[name]
+            self.codes[name].append(lookup.setdefault(value, len(lookup)))
+
+    def append(self, document_id, source_name, source_type, text, created_at):
+        """Adds the row of the next vector."""
+        self._append_encoded(
+            (text or "").encode("utf-8"),
+            (str(document_id or "").encode("utf-8"), str(created_at or "").encode("utf-8")),
+            (source_name, source_type),
+        )
+
+    def copy_rows(self, store, positions):
+        """Appends rows of an existing store (in the given order) without decoding their text."""
+        for i in positions:
+            start, end = int(store.offsets[i]), int(store.offsets[i + 1])
+            self._append_encoded(
+                store.text[start:end].tobytes(),
+                tuple(bytes(store.columns[name][i]) for name in ChunkMetadataStore.FIXED),
+                tuple(store.categories[name][int(store.columns[name][i])] for name in ChunkMetadataStore.CATEGORICAL),
+            )
+
+    def close(self):
+        self.text_file.close()
+        np.save(os.path.join(self.tmp_path, "text_offsets.npy"), np.frombuffer(self.offsets, dtype=np.int64))
+
+        for name, values in self.fixed.items():
+            width = max((len(v) for v in values), default=1) or 1
+            np.save(os.path.join(self.tmp_path, f"{name}.npy"), np.array(values, dtype=f"S{width}"))
+
+        columns = {"count": len(self)}
+        for name in ChunkMetadataStore.CATEGORICAL:
+            np.save(os.path.join(self.tmp_path, f"{name}.npy"), np.frombuffer(self.codes[name], dtype=np.int32))
+            columns[name] = list(self.lookups[name])
+        with open(os.path.join(self.tmp_path, "columns.json"), "w") as f:
+            json.dump(columns, f)
+
+        self._swap_in()
+
+    def _swap_in(self):
+        """
+        Moves the previous store aside (not deleting it first), renames the finished one in
+        and replaces the staged companion files right after, so readers find a complete store
+        at `path` throughout and the index and metadata change together.
+        """
+        old_path = f"{self.path}.old{os.getpid()}"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.rename(self.path, old_path)
+        try:
+            os.rename(self.tmp_path, self.path)
+        except OSError:
+            if os.path.exists(old_path):
+                os.rename(old_path, self.path)
+            raise
+        for staged_path, final_path in self.staged:
+            os.replace(staged_path, final_path)
+        shutil.rmtree(old_path, ignore_errors=True)
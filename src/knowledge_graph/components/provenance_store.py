@@ -0,0 +1,83 @@
+import os
+import json
+import sqlite3
+from contextlib import closing
+
+from src.knowledge_graph.logger.logging import logger
+
+# SQLite caps the number of bound parameters per statement
+_LOOKUP_BATCH = 500
+
+
+class ProvenanceStore:
+    """
+    doc_id -> entities/edges it produced as of the last graph sync, in SQLite.
+
+    One row per document (entity keys and [head, relation, tail, co-occurrences] edges as
+    JSON), keyed by doc_id, so a sync only reads and rewrites the documents it touches.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _connect(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS provenance ("
+            "doc_id TEXT PRIMARY KEY, entities TEXT NOT NULL, edges TEXT NOT NULL) WITHOUT ROWID"
+        )
+        return conn
+
+    def doc_ids(self):
+        """Every document the graph currently holds provenance for."""
+        if not self.exists():
+            return set()
+        with closing(self._connect()) as conn:
+            return {doc_id for (doc_id,) in conn.execute("SELECT doc_id FROM provenance")}
+
+    def get(self, doc_ids):
+        """{doc_id: {"entities", "edges"}} for the given documents that have provenance."""
+        doc_ids = list(doc_ids)
+        found = {}
+        if not doc_ids or not self.exists():
+            return found
+        with closing(self._connect()) as conn:
+            for start in range(0, len(doc_ids), _LOOKUP_BATCH):
+                batch = doc_ids[start:start + _LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT doc_id, entities, edges FROM provenance "
+                    f"WHERE doc_id IN ({', '.join('?' * len(batch))})", batch
+                )
+                for doc_id, entities, edges in rows:
+                    found[doc_id] = {"entities": json.loads(entities), "edges": json.loads(edges)}
+        return found
+
+    def write(self, provenance, removed=(), clear=False):
+        """
+        Upserts {doc_id: {"entities", "edges"}} and drops the `removed` documents in one
+        transaction (`clear` drops every other document first, for full rebuilds).
+        """
+        with closing(self._connect()) as conn, conn:
+            if clear:
+                conn.execute("DELETE FROM provenance")
+            conn.executemany("DELETE FROM provenance WHERE doc_id = ?", ((doc_id,) for doc_id in removed))
+            conn.executemany(
+                "INSERT OR REPLACE INTO provenance (doc_id, entities, edges) VALUES (?, ?, ?)",
+                (
+                    (doc_id, json.dumps(items["entities"], ensure_ascii=False),
+                     json.dumps(items["edges"], ensure_ascii=False))
+                    for doc_id, items in provenance.items()
+                )
+            )
+
+    def import_json(self, json_path):
+        """One-off migration from the provenance.json blob earlier versions wrote."""
+        with open(json_path) as f:
+            provenance = json.load(f)
+        self.write(provenance, clear=True)
+        logger.info(f"Imported provenance of {len(provenance)} documents from {json_path}")
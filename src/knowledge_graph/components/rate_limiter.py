@@ -0,0 +1,108 @@
+import time
+import random
+import asyncio
+import threading
+
+from src.knowledge_graph.logger.logging import logger
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by threads and coroutines: `requests_per_minute`
+    tokens are refilled continuously and up to `burst` can be spent at once.
+    Callers reserve a token under the lock and then sleep outside it, so waiting
+    callers are served in arrival order without holding anything.
+    """
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Takes one token (possibly going into debt) and returns how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds):
+        """Drains the bucket so nobody sends for `seconds` (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+def is_rate_limit_error(e):
+    """HTTP 429 from the Groq/OpenAI-style clients (or anything that says so)."""
+    status = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    message = str(e).lower()
+    return "429" in message or "rate limit" in message or "rate_limit" in message
+
+
+def _retry_after(e):
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_delay(e, attempt, base_delay, max_delay):
+    # Full jitter, so concurrent callers that failed together do not retry together
+    delay = _retry_after(e)
+    if delay is None:
+        delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    return min(delay, max_delay)
+
+
+async def aretry_with_backoff(call, limiter=None, max_retries=6, base_delay=2.0, max_delay=60.0):
+    """
+    Awaits `call()` (a coroutine factory), waiting for a `limiter` token before every attempt
+    and backing off exponentially on rate-limit errors. Other errors are raised immediately.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            await limiter.aacquire()
+        try:
+            return await call()
+        except Exception as e:
+            if attempt == max_retries or not is_rate_limit_error(e):
+                raise
+            delay = _backoff_delay(e, attempt, base_delay, max_delay)
+            if limiter is not None and _retry_after(e):
+                limiter.pause(delay)
+            logger.warning(f"Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            await asyncio.sleep(delay)
+
+
+def retry_with_backoff(call, limiter=None, max_retries=6, base_delay=2.0, max_delay=60.0):
+    """Blocking version of aretry_with_backoff, for `call()` returning the result directly."""
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return call()
+        except Exception as e:
+            if attempt == max_retries or not is_rate_limit_error(e):
+                raise
+            delay = _backoff_delay(e, attempt, base_delay, max_delay)
+            if limiter is not None and _retry_after(e):
+                limiter.pause(delay)
+            logger.warning(f"Rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{max_retries})")
+            time.sleep(delay)
@@ -0,0 +1,118 @@
+import faiss
+import numpy as np
+
+from src.knowledge_graph.logger.logging import logger
+
+# Supported vector_store.index_type values (an "Index" prefix, e.g. IndexIVFFlat, is accepted)
+INDEX_TYPES = ("Flat", "IVFFlat", "HNSWFlat", "IVFPQ")
+
+# FAISS wants roughly this many training points per IVF centroid
+MIN_POINTS_PER_CENTROID = 39
+
+# vector_store.metric -> FAISS metric. Embeddings are L2-normalized, so "ip" is cosine similarity
+METRICS = {"ip": faiss.METRIC_INNER_PRODUCT, "l2": faiss.METRIC_L2}
+
+
+def canonical_index_type(index_type):
+    """'IndexFlatL2' -> 'Flat', 'IndexIVFPQ' -> 'IVFPQ', ..."""
+    name = index_type[len("Index"):] if index_type.startswith("Index") else index_type
+    if name in ("FlatL2", "FlatIP"):
+        name = "Flat"
+    if name not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index_type '{index_type}', expected one of {INDEX_TYPES}")
+    return name
+
+
+def supports_incremental_update(index_type, metric, previous_params):
+    """
+    Only flat indexes keep vector ids equal to metadata positions after remove_ids;
+    IVF keeps the original ids and HNSW cannot remove at all, so those are rebuilt.
+    The saved index must also have been built as Flat with the same metric.
+    """
+    # Indexes saved before build params were recorded are FlatL2
+    previous_params = previous_params or {"index_type": "Flat", "metric": "l2"}
+    return (
+        canonical_index_type(index_type) == "Flat"
+        and previous_params.get("index_type") == "Flat"
+        and previous_params.get("metric", "l2") == metric
+    )
+
+
+def build_index(embeddings, index_type, params, metric="ip"):
+    """
+    Builds and fills a FAISS index of the requested type, training on a random sample
+    when needed. Falls back to a simpler type when there are too few vectors to train.
+
+    Returns (index, build_params) where build_params describes what was actually built.
+    """
+    n, dim = embeddings.shape
+    kind = canonical_index_type(index_type)
+    train_n = min(n, params.train_sample)
+
+    nlist = None
+    if kind in ("IVFFlat", "IVFPQ"):
+        nlist = params.nlist or int(4 * np.sqrt(n))
+        nlist = min(nlist, train_n // MIN_POINTS_PER_CENTROID)
+        if kind == "IVFPQ" and (dim % params.pq_m != 0 or train_n < 2 ** params.pq_nbits * MIN_POINTS_PER_CENTROID):
+            logger.warning(f"IVFPQ needs pq_m to divide {dim} and enough vectors to train; using IVFFlat.")
+            kind = "IVFFlat"
+        if nlist < 2:
+            logger.warning(f"Only {n} vectors, too few to train an IVF index; using Flat.")
+            kind, nlist = "Flat", None
+
+    factory = {
+        "Flat": "Flat",
+        "IVFFlat": f"IVF{nlist},Flat",
+        "HNSWFlat": f"HNSW{params.hnsw_m}",
+        "IVFPQ": f"IVF{nlist},PQ{params.pq_m}x{params.pq_nbits}",
+    }[kind]
+    index = faiss.index_factory(dim, factory, METRICS[metric])
+
+    if kind == "HNSWFlat":
+        index.hnsw.efConstruction = params.ef_construction
+
+    trained_on = 0
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        trained_on = train_n
+        sample = embeddings[np.sort(rng.choice(n, trained_on, replace=False))]
+        logger.info(f"Training {factory} index on {trained_on} sampled vectors...")
+        index.train(sample)
+
+    index.add(embeddings)
+
+    build_params = {
+        "index_type": kind,
+        "factory": factory,
+        "metric": metric,
+        "dim": dim,
+        "ntotal": index.ntotal,
+        "nlist": nlist,
+        "hnsw_m": params.hnsw_m if kind == "HNSWFlat" else None,
+        "ef_construction": params.ef_construction if kind == "HNSWFlat" else None,
+        "pq_m": params.pq_m if kind == "IVFPQ" else None,
+        "pq_nbits": params.pq_nbits if kind == "IVFPQ" else None,
+        "trained_on": trained_on,
+    }
+    return index, build_params
+
+
+def similarity_scores(index, distances):
+    """
+    Converts raw FAISS distances to cosine similarity for normalized vectors:
+    inner product already is one; squared L2 maps as 1 - d / 2.
+    """
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        return distances
+    return 1.0 - distances / 2.0
+
+
+def configure_search(index, nprobe=None, ef_search=None):
+    """Applies query-time knobs in place: nprobe for IVF indexes, efSearch for HNSW."""
+    # The downcast view does not own the index, so only use it to set parameters
+    view = faiss.downcast_index(index)
+    if nprobe and isinstance(view, faiss.IndexIVF):
+        view.nprobe = nprobe
+    if ef_search and isinstance(view, faiss.IndexHNSW):
+        view.hnsw.efSearch = ef_search
+    return index
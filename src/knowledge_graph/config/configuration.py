@@ -1,8 +1,11 @@
 from src.knowledge_graph.utils.common import read_yaml
-from src.knowledge_graph.entity.config_entity import (DataIngestionConfig,DataTransformationConfig,
+from src.knowledge_graph.entity.config_entity import (DataIngestionConfig,IngestionParallelConfig,DatabaseConfig,
+                                                      DataTransformationConfig,SpacyConfig,RelationshipConfig,GraphLoaderConfig,
                                                       EmbeddingPipelineConfig,ChunkingConfig,EmbeddingModelConfig,
-                                                      VectorStoreConfig,
-                                                      faiss_data,llmconfig,neo4j_config,Ragpipelineconfig)
+                                                      EmbeddingCacheConfig,
+                                                      VectorStoreConfig,IndexParamsConfig,
+                                                      faiss_data,llmconfig,neo4j_config,retrieval_config,answer_cache_config,Ragpipelineconfig,
+                                                      EvaluationConfig,RateLimitConfig,RetryConfig,MetricsConfig)
 from src.knowledge_graph.constants import *
 
 class ConfigManager:
@@ -17,48 +20,118 @@ class ConfigManager:
             pdf_dir=config.pdf_dir,
             csv_dir=config.csv_dir,
             db_path=config.db_path,
-            output_json=config.output_json,
+            output_records=config.output_records,
+            incremental=config.incremental,
+            manifest_path=config.manifest_path,
+            delta_json=config.delta_json,
+            parallel=IngestionParallelConfig(num_workers=config.parallel.num_workers,
+                                             pdf_pages_per_task=config.parallel.pdf_pages_per_task,
+                                             chunk_size=config.parallel.chunk_size),
+            database=DatabaseConfig(immutable=config.database.immutable,
+                                    page_size=config.database.page_size,
+                                    tables=config.database.tables.to_dict()),
         )
     def get_data_transformation_config(self) -> DataTransformationConfig:
         config = self.config.data_transformation
 
         return DataTransformationConfig(
-            input_json=config.input_json,
+            input_records=config.input_records,
+            incremental=config.incremental,
             entities_output=config.entities_output,
             relationships_output=config.relationships_output,
             triples_output=config.triples_output,
+            sentences_output=config.sentences_output,
+            graph_version_path=config.graph_version_path,
+            provenance_path=config.provenance_path,
             neo4j_uri=config.neo4j.uri,
             neo4j_username=config.neo4j.username,
             neo4j_password=config.neo4j.password,
+            spacy=SpacyConfig(model=config.spacy.model,
+                              batch_size=config.spacy.batch_size,
+                              n_process=config.spacy.n_process,
+                              disable=list(config.spacy.disable)),
+            relationships=RelationshipConfig(strategy=config.relationships.strategy,
+                                             window=config.relationships.window,
+                                             max_path_length=config.relationships.max_path_length,
+                                             max_pairs_per_sentence=config.relationships.max_pairs_per_sentence),
+            graph_loader=GraphLoaderConfig(mode=config.graph_loader.mode,
+                                           batch_size=config.graph_loader.batch_size,
+                                           num_workers=config.graph_loader.num_workers,
+                                           max_retry_time=config.graph_loader.max_retry_time,
+                                           csv_dir=config.graph_loader.csv_dir),
         )
     def get_embedding_pipeline_config(self) -> EmbeddingPipelineConfig:
         config = self.config.embedding_pipeline
 
         return EmbeddingPipelineConfig(
-            input_json=config.input_json,
+            input_records=config.input_records,
+            incremental=config.incremental,
             chunking=ChunkingConfig(chunk_size=config.chunking.chunk_size,
                                     chunk_overlap=config.chunking.chunk_overlap),
             embedding_model=EmbeddingModelConfig(name = config.embedding_model.name,
                                                 embedding_dim=config.embedding_model.embedding_dim),
+            embedding_cache=EmbeddingCacheConfig(enabled=config.embedding_cache.enabled,
+                                                 cache_dir=config.embedding_cache.cache_dir,
+                                                 dtype=config.embedding_cache.dtype),
             vector_store=VectorStoreConfig(type = config.vector_store.type,
                                         index_type=config.vector_store.index_type,
+                                        metric=config.vector_store.metric,
+                                        index_params=IndexParamsConfig(**config.vector_store.index_params),
                                         index_path = config.vector_store.index_path,
-                                        metadata_path= config.vector_store.metadata_path)
+                                        metadata_path= config.vector_store.metadata_path,
+                                        params_path= config.vector_store.params_path)
         )
     
     def get_rag_pipeline_config(self)->Ragpipelineconfig:
         config = self.config.rag
 
         return Ragpipelineconfig(
-            input_json = config.input_json,
+            input_records = config.input_records,
             faiss = faiss_data(index_path = config.faiss.index_path,
                         metadata_path = config.faiss.metadata_path,
-                        top_k = config.faiss.top_k),
+                        top_k = config.faiss.top_k,
+                        nprobe = config.faiss.nprobe,
+                        ef_search = config.faiss.ef_search,
+                        score_threshold = config.faiss.score_threshold),
             neo4j = neo4j_config(uri = config.neo4j.uri,
                         username = config.neo4j.username,
                         password = config.neo4j.password),
             llm = llmconfig(provider = config.llm.provider,
                         model = config.llm.model,
                         temperature = config.llm.temperature,
-                        max_tokens = config.llm.max_tokens)  
-        )
\ No newline at end of file
+                        max_tokens = config.llm.max_tokens),
+            retrieval = retrieval_config(top_k_graph = config.retrieval.top_k_graph,
+                        vector_timeout = config.retrieval.vector_timeout,
+                        graph_timeout = config.retrieval.graph_timeout),
+            answer_cache = answer_cache_config(enabled = config.answer_cache.enabled,
+                        similarity_threshold = config.answer_cache.similarity_threshold,
+                        ttl_seconds = config.answer_cache.ttl_seconds,
+                        max_entries = config.answer_cache.max_entries,
+                        graph_version_path = config.answer_cache.graph_version_path)
+        )
+    def get_evaluation_config(self) -> EvaluationConfig:
+        config = self.config.evaluation
+
+        return EvaluationConfig(
+            answers_path = config.answers_path,
+            results_path = config.results_path,
+            output_csv = config.output_csv,
+            max_concurrency = config.max_concurrency,
+            generation_rate_limit = RateLimitConfig(requests_per_minute = config.generation_rate_limit.requests_per_minute,
+                        burst = config.generation_rate_limit.burst),
+            judge_rate_limit = RateLimitConfig(requests_per_minute = config.judge_rate_limit.requests_per_minute,
+                        burst = config.judge_rate_limit.burst),
+            retry = RetryConfig(max_retries = config.retry.max_retries,
+                        base_delay = config.retry.base_delay,
+                        max_delay = config.retry.max_delay)
+        )
+
+    def get_metrics_config(self) -> MetricsConfig:
+        config = self.config.metrics
+
+        return MetricsConfig(
+            enabled = config.enabled,
+            host = config.host,
+            port = config.port,
+            report_path = config.report_path
+        )
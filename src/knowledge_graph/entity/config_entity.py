@@ -2,6 +2,18 @@ from dataclasses import dataclass
 from pathlib import Path
 
 #data ingestion part
+@dataclass
+class IngestionParallelConfig:
+    num_workers: int
+    pdf_pages_per_task: int
+    chunk_size: int
+
+@dataclass
+class DatabaseConfig:
+    immutable: bool
+    page_size: int
+    tables: dict
+
 @dataclass
 class DataIngestionConfig:
     root_dir: Path
@@ -9,18 +21,52 @@ class DataIngestionConfig:
     pdf_dir: Path
     csv_dir: Path
     db_path: Path
-    output_json: str
+    output_records: Path
+    incremental: bool
+    manifest_path: Path
+    delta_json: Path
+    parallel: IngestionParallelConfig
+    database: DatabaseConfig
 
 #datatransformation part
+@dataclass
+class SpacyConfig:
+    model: str
+    batch_size: int
+    n_process: int
+    disable: list
+
+@dataclass
+class RelationshipConfig:
+    strategy: str
+    window: int
+    max_path_length: int
+    max_pairs_per_sentence: int
+
+@dataclass
+class GraphLoaderConfig:
+    mode: str
+    batch_size: int
+    num_workers: int
+    max_retry_time: float
+    csv_dir: Path
+
 @dataclass
 class DataTransformationConfig:
-    input_json: Path
+    input_records: Path
+    incremental: bool
     entities_output: Path
     relationships_output: Path
     triples_output: Path
+    sentences_output: Path
+    graph_version_path: Path
+    provenance_path: Path
     neo4j_uri: str
     neo4j_username: str
     neo4j_password: str
+    spacy: SpacyConfig
+    relationships: RelationshipConfig
+    graph_loader: GraphLoaderConfig
 
 #data embedding part
 @dataclass
@@ -33,18 +79,38 @@ class EmbeddingModelConfig:
     name: str
     embedding_dim: int
 
+@dataclass
+class EmbeddingCacheConfig:
+    enabled: bool
+    cache_dir: Path
+    dtype: str
+
+@dataclass
+class IndexParamsConfig:
+    nlist: int
+    hnsw_m: int
+    ef_construction: int
+    pq_m: int
+    pq_nbits: int
+    train_sample: int
+
 @dataclass
 class VectorStoreConfig:
     type: str
     index_type: str
+    metric: str
+    index_params: IndexParamsConfig
     index_path: Path
     metadata_path: Path
+    params_path: Path
 
 @dataclass
 class EmbeddingPipelineConfig:
-    input_json: Path
+    input_records: Path
+    incremental: bool
     chunking: ChunkingConfig
     embedding_model: EmbeddingModelConfig
+    embedding_cache: EmbeddingCacheConfig
     vector_store: VectorStoreConfig
 
 #Rag part
@@ -53,6 +119,9 @@ class faiss_data:
     index_path: Path
     metadata_path: Path
     top_k: int
+    nprobe: int
+    ef_search: int
+    score_threshold: float
 
 @dataclass
 class llmconfig:
@@ -67,9 +136,54 @@ class neo4j_config:
     username: str
     password: str
 
+@dataclass
+class retrieval_config:
+    top_k_graph: int
+    vector_timeout: float
+    graph_timeout: float
+
+@dataclass
+class answer_cache_config:
+    enabled: bool
+    similarity_threshold: float
+    ttl_seconds: float
+    max_entries: int
+    graph_version_path: Path
+
 @dataclass
 class Ragpipelineconfig:
-    input_json: Path
+    input_records: Path
     faiss: faiss_data
     neo4j: neo4j_config
-    llm: llmconfig
\ No newline at end of file
+    llm: llmconfig
+    retrieval: retrieval_config
+    answer_cache: answer_cache_config
+#Evaluation part
+@dataclass
+class RateLimitConfig:
+    requests_per_minute: float
+    burst: int
+
+@dataclass
+class RetryConfig:
+    max_retries: int
+    base_delay: float
+    max_delay: float
+
+@dataclass
+class EvaluationConfig:
+    answers_path: Path
+    results_path: Path
+    output_csv: Path
+    max_concurrency: int
+    generation_rate_limit: RateLimitConfig
+    judge_rate_limit: RateLimitConfig
+    retry: RetryConfig
+
+#Metrics part
+@dataclass
+class MetricsConfig:
+    enabled: bool
+    host: str
+    port: int
+    report_path: Path
@@ -8,18 +8,28 @@ logging_str = "[%(asctime)s: %(levelname)s: %(module)s: %(message)s]"
 
 
 log_path = os.path.join(os.getcwd(), "logs")
-os.makedirs(log_path, exist_ok=True)
 LOG_FILE_PATH = os.path.join(log_path, LOG_FILE)
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format=logging_str,
-    handlers=[
-        logging.FileHandler(LOG_FILE_PATH), # Saves to file
-        logging.StreamHandler()             # Prints to console
-    ]
-)
+class _LazyFileHandler(logging.FileHandler):
+    """FileHandler that creates logs/ and the timestamped file on the first record, not at import."""
 
-logger = logging.getLogger("my_app")
+    def __init__(self, path):
+        super().__init__(path, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
 
+
+# Handlers live on the package logger, not the root logger, so importing the package
+# neither touches the filesystem nor reconfigures logging for the host app
+logger = logging.getLogger("my_app")
+if not logger.handlers:
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter(logging_str)
+    for handler in (_LazyFileHandler(LOG_FILE_PATH),   # Saves to file
+                    logging.StreamHandler()):         # Prints to console
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.propagate = False
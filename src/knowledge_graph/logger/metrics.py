@@ -0,0 +1,247 @@
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.knowledge_graph.logger.logging import logger
+
+# Seconds: spans range from sub-millisecond FAISS searches to multi-minute pipeline stages
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0, 60.0, 120.0, 300.0, 600.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f"{k}=\"{_escape(v)}\"" for k, v in pairs) + "}"
+
+
+def _format_value(value):
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label set."""
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(key)} {_format_value(v)}" for key, v in sorted(values.items())]
+
+    def snapshot(self):
+        with self._lock:
+            return {_format_labels(key) or "{}": v for key, v in sorted(self._values.items())}
+
+
+class Histogram:
+    """Bucketed histogram per label set, with Prometheus-style quantile estimates for reports."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.bounds = tuple(sorted(buckets)) + (float("inf"),)
+        self._series = {}      # label key -> [per-bucket counts, sum, count, max]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.bounds), 0.0, 0, 0.0]
+            for i, bound in enumerate(self.bounds):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+            series[3] = max(series[3], value)
+
+    def _quantile(self, counts, count, q):
+        # Linear interpolation inside the bucket holding the q-th observation (as histogram_quantile)
+        rank, cumulative, lower = q * count, 0, 0.0
+        for bound, n in zip(self.bounds, counts):
+            if n and cumulative + n >= rank:
+                if bound == float("inf"):
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / n
+            cumulative += n
+            lower = bound
+        return lower
+
+    def lines(self):
+        with self._lock:
+            series = {key: (list(s[0]), s[1], s[2]) for key, s in self._series.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, n in zip(self.bounds, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            series = {key: (list(s[0]), s[1], s[2], s[3]) for key, s in self._series.items()}
+        report = {}
+        for key, (counts, total, count, peak) in sorted(series.items()):
+            entry = {"count": count, "sum": round(total, 6), "mean": round(total / count, 6), "max": round(peak, 6)}
+            entry.update({f"p{int(q * 100)}": round(self._quantile(counts, count, q), 6) for q in QUANTILES})
+            report[_format_labels(key) or "{}"] = entry
+        return report
+
+
+class MetricsRegistry:
+    """Process-wide metric families, rendered in the Prometheus text format or as a JSON-able report."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name, documentation):
+        return self._get(name, lambda: Counter(name, documentation))
+
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        return self._get(name, lambda: Histogram(name, documentation, buckets))
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+
+# One registry per process
+metrics = MetricsRegistry()
+
+SPAN_SECONDS = metrics.histogram("kg_span_duration_seconds", "Duration of instrumented pipeline and request steps.")
+SPAN_ITEMS = metrics.counter("kg_span_items_total", "Items (records, texts, rows, queries) handled by instrumented steps.")
+SPAN_ERRORS = metrics.counter("kg_span_errors_total", "Instrumented steps that raised.")
+
+
+class Span:
+    __slots__ = ("items",)
+
+    def __init__(self):
+        self.items = 0
+
+    def add(self, n=1):
+        self.items += n
+
+
+def observe_span(name, seconds, items=0, **labels):
+    """Records a duration measured elsewhere (callbacks, accumulated generator time)."""
+    SPAN_SECONDS.observe(seconds, span=name, **labels)
+    if items:
+        SPAN_ITEMS.inc(items, span=name, **labels)
+
+
+@contextmanager
+def span(name, **labels):
+    """
+    Times the block into kg_span_duration_seconds{span=name, ...}. Call `.add(n)` on the
+    yielded span to count the items it handled; exceptions are counted and re-raised.
+    """
+    current = Span()
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception:
+        SPAN_ERRORS.inc(span=name, **labels)
+        raise
+    finally:
+        observe_span(name, time.perf_counter() - start, current.items, **labels)
+
+
+def timed_iter(iterable, name, **labels):
+    """
+    Yields from `iterable`, recording only the time spent producing items (not the caller's
+    work between them) as one span with the item count, e.g. for lazy nlp.pipe streams.
+    """
+    iterator = iter(iterable)
+    elapsed, count = 0.0, 0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            finally:
+                elapsed += time.perf_counter() - start
+            count += 1
+            yield item
+    finally:
+        observe_span(name, elapsed, count, **labels)
+
+
+# 📡 /metrics endpoint for the long-running chat processes
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Scrapes every few seconds would flood the log
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port, host="0.0.0.0"):
+    """Serves /metrics from a daemon thread, once per process; later calls return the same server."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"Metrics endpoint not started on {host}:{port}: {e}")
+                return None
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return _server
@@ -0,0 +1,121 @@
+import os
+import json
+import asyncio
+
+from src.knowledge_graph.components.rate_limiter import TokenBucket, aretry_with_backoff
+from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+from src.knowledge_graph.pipeline.resources import registry
+from src.knowledge_graph.utils.common import read_jsonl, text_hash
+from src.knowledge_graph.logger.logging import logger
+
+
+class EvaluationRunner:
+    """
+    Resumable, rate-limited evaluation over [{"question", "ground_truth"}, ...].
+
+    1. Answers: one batched retrieval for every question without a cached answer, then
+       concurrent, rate-limited generation. Each answer is appended to answers_path with
+       the contexts it was generated from as soon as it exists.
+    2. Scores: questions are scored concurrently (bounded by max_concurrency) through
+       `score_fn(question, answer, expected, contexts) -> dict`, and every scored
+       question is appended to results_path.
+
+    Both files are append-only caches keyed by question, so a rerun only does what the
+    previous run did not finish; delete them to start over.
+    """
+
+    def __init__(self, config, score_fn):
+        self.config = config
+        self.score_fn = score_fn
+        limit = config.generation_rate_limit
+        self.generation_limiter = TokenBucket(limit.requests_per_minute, limit.burst)
+
+    @staticmethod
+    def key(question):
+        return text_hash(question)
+
+    @staticmethod
+    def _load(path):
+        if not os.path.exists(path):
+            return {}
+        return {record["key"]: record for record in read_jsonl(path)}
+
+    @staticmethod
+    def _append(path, record):
+        # One line per finished item, flushed right away so an interrupted run loses nothing done
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _retry_kwargs(self):
+        retry = self.config.retry
+        return {"max_retries": retry.max_retries, "base_delay": retry.base_delay, "max_delay": retry.max_delay}
+
+    @staticmethod
+    async def _gather(coros, what):
+        # A failed item is logged and left uncached, so the next run retries just that one
+        failures = [r for r in await asyncio.gather(*coros, return_exceptions=True) if isinstance(r, Exception)]
+        for e in failures:
+            logger.error(f"{what} failed: {e.__class__.__name__}: {e}")
+        return failures
+
+    async def generate_answers(self, questions):
+        """{key: {"question", "answer", "contexts"}} for every question, generating only the missing ones."""
+        answers = self._load(self.config.answers_path)
+        pending = {self.key(q): q for q in questions if self.key(q) not in answers}
+        logger.info(f"{len(answers)} cached answers, {len(pending)} to generate")
+        if not pending:
+            return answers
+
+        # Retrieval happens once per question, batched; generation reuses exactly these documents
+        contexts = await RAGPipeline.build_retriever().abatch(list(pending.values()))
+        # The token bucket and backoff below are the only retry layer
+        generation = RAGPipeline.build_answer_generation(llm=registry.evaluation_llm)
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def answer(key, question, docs):
+            async with semaphore:
+                result = await aretry_with_backoff(
+                    lambda: generation.ainvoke({"context": docs, "question": question}),
+                    self.generation_limiter, **self._retry_kwargs()
+                )
+            record = {"key": key, "question": question, "answer": result,
+                      "contexts": [doc.page_content for doc in docs]}
+            self._append(self.config.answers_path, record)
+            answers[key] = record
+
+        await self._gather([answer(k, q, docs) for (k, q), docs in zip(pending.items(), contexts)], "Generation")
+        return answers
+
+    async def score(self, items, answers):
+        """{key: result row} for every answered item, scoring only the ones not scored yet."""
+        results = self._load(self.config.results_path)
+        pending = {}
+        for item in items:
+            key = self.key(item["question"])
+            if key not in results and key in answers:
+                pending.setdefault(key, item)
+        logger.info(f"{len(results)} cached results, {len(pending)} to score")
+        semaphore = asyncio.Semaphore(self.config.max_concurrency)
+
+        async def score(key, item):
+            record = answers[key]
+            async with semaphore:
+                scores = await self.score_fn(item["question"], record["answer"], item["ground_truth"], record["contexts"])
+            row = {"key": key, "question": item["question"], "answer": record["answer"],
+                   "expected": item["ground_truth"], **scores}
+            self._append(self.config.results_path, row)
+            results[key] = row
+
+        await self._gather([score(key, item) for key, item in pending.items()], "Scoring")
+        return results
+
+    async def arun(self, items):
+        """Result rows in the order of `items` (items that still failed are left out)."""
+        answers = await self.generate_answers(list(dict.fromkeys(item["question"] for item in items)))
+        results = await self.score(items, answers)
+        rows = [results.get(self.key(item["question"])) for item in items]
+        return [row for row in rows if row is not None]
+
+    def run(self, items):
+        return asyncio.run(self.arun(items))
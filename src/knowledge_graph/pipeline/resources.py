@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+
+from src.knowledge_graph.config.configuration import ConfigManager
+from src.knowledge_graph.logger.logging import logger
+from src.knowledge_graph.logger.metrics import observe_span
+from dotenv import load_dotenv
+load_dotenv()
+
+
+class ResourceRegistry:
+    """
+    Process-wide holder for the heavy RAG resources (embedder, FAISS index, chunk
+    metadata, spaCy, Neo4j driver, LLM client). Each one is loaded lazily on first
+    use, exactly once, and then shared by every chat session in the process.
+    The libraries behind them (torch, faiss, spacy, neo4j, ...) are imported by the
+    loaders too, so importing this module stays cheap.
+    """
+
+    def __init__(self):
+        # Re-entrant: loaders use other resources (e.g. the answer cache needs the embedder)
+        self._lock = threading.RLock()
+        self._resources = {}
+
+    def _get(self, name, loader):
+        # Double-checked so the hot path never takes the lock
+        value = self._resources.get(name)
+        if value is None:
+            with self._lock:
+                value = self._resources.get(name)
+                if value is None:
+                    logger.info(f"Loading shared resource: {name}")
+                    start = time.perf_counter()
+                    value = loader()
+                    self._resources[name] = value
+                    # Includes the library imports, which happen here on first use
+                    elapsed = time.perf_counter() - start
+                    observe_span("resource.load", elapsed, resource=name)
+                    logger.info(f"Loaded shared resource: {name} in {elapsed:.2f}s")
+        return value
+
+    def override(self, **resources):
+        """Installs ready-made resources (e.g. benchmark stand-ins) in place of their loaders."""
+        with self._lock:
+            self._resources.update(resources)
+
+    @property
+    def config(self):
+        return self._get("config", lambda: ConfigManager().get_rag_pipeline_config())
+
+    @property
+    def embedder(self):
+        return self._get("embedder", self._load_embedder)
+
+    @staticmethod
+    def _load_embedder():
+        from sentence_transformers import SentenceTransformer
+        # Note: We still use SentenceTransformer for embeddings locally to match your FAISS index
+        return SentenceTransformer('all-MiniLM-L6-v2')
+
+    @property
+    def query_embedder(self):
+        # Shared by the answer cache and the retriever, so a cache miss costs one encode, not two
+        return self._get("query_embedder", self._load_query_embedder)
+
+    def _load_query_embedder(self):
+        from src.knowledge_graph.components.answer_cache import QueryEmbeddingMemo
+        return QueryEmbeddingMemo(self.embedder)
+
+    @property
+    def vector_index(self):
+        return self._get("vector_index", self._load_vector_index)
+
+    def _load_vector_index(self):
+        import faiss
+        return faiss.read_index(self.config.faiss.index_path)
+
+    @property
+    def vector_metadata(self):
+        return self._get("vector_metadata", self._load_vector_metadata)
+
+    def _load_vector_metadata(self):
+        from src.knowledge_graph.components.metadata_store import ChunkMetadataStore
+        # Artifacts built before the store existed ship a metadata.json; convert it on first load
+        ChunkMetadataStore.migrate_legacy(self.config.faiss.metadata_path)
+        # Memory-mapped, rows decoded lazily by vector id
+        return ChunkMetadataStore(self.config.faiss.metadata_path)
+
+    @property
+    def nlp(self):
+        return self._get("nlp", self._load_nlp)
+
+    @staticmethod
+    def _load_nlp():
+        import spacy
+        return spacy.load("en_core_web_sm")
+
+    @property
+    def graph(self):
+        return self._get("graph", self._load_graph)
+
+    def _load_graph(self):
+        from neo4j import GraphDatabase
+        from src.knowledge_graph.components.graph_schema import ensure_entity_indexes
+        driver = GraphDatabase.driver(
+            os.getenv("NEO_4J_URI"),
+            auth=(self.config.neo4j.username, os.getenv("PASSWORD"))
+        )
+        # Graphs built before the name index existed get it here, so lookups never fall back to scans
+        with driver.session() as session:
+            ensure_entity_indexes(session)
+        return driver
+
+    @property
+    def async_graph(self):
+        # Async driver for the concurrent retrieval path; it binds to the first event loop
+        # that uses it, which is fine for a single-loop server like Chainlit
+        return self._get("async_graph", self._load_async_graph)
+
+    def _load_async_graph(self):
+        from neo4j import AsyncGraphDatabase
+        return AsyncGraphDatabase.driver(
+            os.getenv("NEO_4J_URI"),
+            auth=(self.config.neo4j.username, os.getenv("PASSWORD"))
+        )
+
+    @property
+    def llm(self):
+        return self._get("llm", self._load_llm)
+
+    def _load_llm(self, **overrides):
+        from langchain_groq import ChatGroq
+        return ChatGroq(
+            model=self.config.llm.model,
+            groq_api_key=os.getenv("GROQ_API_KEY"),
+            temperature=self.config.llm.temperature,
+            max_tokens=self.config.llm.max_tokens,
+            **overrides
+        )
+
+    @property
+    def evaluation_llm(self):
+        # Same model for callers that pace and retry calls themselves (token bucket + backoff),
+        # so the client's own retries do not stack on top of theirs
+        return self._get("evaluation_llm", lambda: self._load_llm(max_retries=0))
+
+    @property
+    def answer_cache(self):
+        return self._get("answer_cache", self._load_answer_cache)
+
+    def _load_answer_cache(self):
+        from src.knowledge_graph.components.answer_cache import SemanticAnswerCache, file_version
+        cache = self.config.answer_cache
+        faiss_cfg = self.config.faiss
+        return SemanticAnswerCache(
+            self.query_embedder,
+            similarity_threshold=cache.similarity_threshold,
+            ttl_seconds=cache.ttl_seconds,
+            max_entries=cache.max_entries,
+            version_fn=lambda: file_version(
+                faiss_cfg.index_path,
+                os.path.join(faiss_cfg.metadata_path, "columns.json"),
+                cache.graph_version_path
+            )
+        )
+
+    def warm_up(self):
+        """Loads every resource up front, e.g. at server start, so no user pays for it."""
+        for name in ("config", "embedder", "query_embedder", "vector_index", "vector_metadata", "nlp", "graph", "llm"):
+            getattr(self, name)
+        logger.info("Shared RAG resources warmed up")
+
+    def close(self):
+        graph = self._resources.pop("graph", None)
+        if graph is not None:
+            graph.close()
+
+    async def aclose(self):
+        self.close()
+        async_graph = self._resources.pop("async_graph", None)
+        if async_graph is not None:
+            await async_graph.close()
+
+
+# One registry per process
+registry = ResourceRegistry()
@@ -12,8 +12,7 @@ class DataTransformationTrainingPipeline:
             config = ConfigManager()
             config = config.get_data_transformation_config()
             obj = DataTransformation(config)
-            obj.extract_entities()
-            obj.extract_relationships()
+            obj.extract_entities_and_relationships()
             obj.create_triples()
             obj.build_graph()
         except Exception as e :
@@ -12,9 +12,7 @@ class DataEmbeddingPipeline:
             config = ConfigManager()
             config = config.get_embedding_pipeline_config()
             obj = DataEmbedding(config)
-            obj.prepare_chunks()
-            vector = obj.generate_embeddings()
-            obj.save_vector_store(vector)
+            obj.build_vector_store()
             obj.show_faiss_index()
         except Exception as e :
             raise KGException(e,sys)
\ No newline at end of file
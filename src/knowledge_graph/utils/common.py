@@ -2,6 +2,10 @@ import os
 import yaml
 from src.knowledge_graph.logger.logging import logger
 import json
+import gzip
+import hashlib
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
@@ -39,6 +43,83 @@ def write_json(path, data):
     with open(path, "w") as f:
         json.dump(data, f, indent=4)
 
+def write_json_list(path, items):
+    """Streams a sequence to a JSON array, one compact item per line, without building it in memory."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("[")
+        for i, item in enumerate(items):
+            f.write(",\n" if i else "\n")
+            f.write(json.dumps(item, ensure_ascii=False))
+        f.write("\n]\n")
+
 def read_json(path):
     with open(path, "r") as f:
-        return json.load(f)
\ No newline at end of file
+        return json.load(f)
+
+def text_hash(text, length=16):
+    """Short, stable content hash used for record and chunk ids."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:length]
+
+def file_sha256(path, block_size=1 << 20):
+    """Streams a file through SHA-256 without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def open_text(path, mode="rt"):
+    """Opens a UTF-8 text file, transparently gzip-compressed when the path ends in .gz"""
+    if os.path.dirname(path) and ("w" in mode or "a" in mode):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def write_jsonl(path, records):
+    """Streams records to a line-delimited JSON file and returns how many were written."""
+    count = 0
+    with open_text(path, "wt") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+def read_jsonl(path):
+    """Lazily yields one record per line, so callers never hold the whole file in memory."""
+    with open_text(path, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class SerialExecutor(Executor):
+    """Runs tasks inline; used when num_workers <= 1 so no processes are spawned."""
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+def make_executor(num_workers):
+    """Process pool for CPU-bound pure-Python work, or an inline executor for a single worker."""
+    if num_workers and num_workers > 1:
+        return ProcessPoolExecutor(max_workers=num_workers)
+    return SerialExecutor()
+
+def ordered_futures(executor, fn, tasks, max_pending):
+    """
+    Submits fn(*args) for each args tuple in `tasks` and yields the futures in
+    submission order, keeping at most `max_pending` in flight so output stays
+    deterministic and memory stays bounded.
+    """
+    pending = deque()
+    for args in tasks:
+        pending.append(executor.submit(fn, *args))
+        if len(pending) >= max_pending:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
@@ -0,0 +1,78 @@
+import sys
+import time
+import builtins
+import threading
+
+
+class ImportTimer:
+    """
+    Measures the imports done inside a `with` block, attributed by top-level package
+    with self time only (like `python -X importtime`, summed per package), and logs the
+    breakdown on exit. Meant to wrap an entry point's import section:
+
+        with ImportTimer("app.py"):
+            import chainlit as cl
+            from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+
+    Only the thread that opened the block is measured; other threads import normally.
+    """
+
+    def __init__(self, label, top=8):
+        self.label = label
+        self.top = top
+        self.self_times = {}   # top-level package -> seconds spent in its own module code
+        self.total = 0.0
+
+    def _package(self, name, globals, level):
+        if level and globals:
+            name = globals.get("__package__") or globals.get("__name__", "")
+        return name.split(".")[0] or "?"
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Already-imported modules (the common case) and other threads pass straight through
+        if (level == 0 and not fromlist and name in sys.modules) or threading.get_ident() != self._thread:
+            return self._original(name, globals, locals, fromlist, level)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            package = self._package(name, globals, level)
+            self.self_times[package] = self.self_times.get(package, 0.0) + elapsed - children
+
+    def __enter__(self):
+        self._modules_before = len(sys.modules)
+        self._thread = threading.get_ident()
+        self._children = []
+        self._original = builtins.__import__
+        builtins.__import__ = self._timed_import
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total = time.perf_counter() - self._start
+        builtins.__import__ = self._original
+        # Nothing new imported (e.g. a Streamlit rerun of the script): nothing worth reporting
+        if len(sys.modules) > self._modules_before:
+            self.report()
+        return False
+
+    def breakdown(self):
+        """[(package, seconds)], slowest first."""
+        return sorted(self.self_times.items(), key=lambda item: item[1], reverse=True)
+
+    def report(self):
+        # Imported here so the timer itself can be imported before anything else
+        from src.knowledge_graph.logger.logging import logger
+        from src.knowledge_graph.logger.metrics import observe_span
+
+        breakdown = self.breakdown()
+        shown = ", ".join(f"{package} {seconds:.2f}s" for package, seconds in breakdown[:self.top])
+        logger.info(f"{self.label} imports took {self.total:.2f}s ({shown})")
+        observe_span("startup.imports", self.total, entry_point=self.label)
+        for package, seconds in breakdown[:self.top]:
+            observe_span("startup.import", seconds, entry_point=self.label, package=package)
@@ -1,5 +1,11 @@
-import streamlit as st
-from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+from src.knowledge_graph.utils.import_timer import ImportTimer
+
+# Logs how long startup imports took, per package (only on the first run; reruns import nothing new)
+with ImportTimer("st_app.py"):
+    import streamlit as st
+    from src.knowledge_graph.pipeline.rag_pipeline import RAGPipeline
+    from src.knowledge_graph.config.configuration import ConfigManager
+    from src.knowledge_graph.logger.metrics import start_metrics_server
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -14,12 +20,23 @@ st.caption("Your Knowledge Graph AI connected to Neo4j & Vector Database")
 
 # --- 1. Startup & Initialization ---
 
-# Cache the chain loader so it only runs once per session (not on every message)
+# Cache the chain loader so it only runs once per process (not on every message)
+# The heavy models/index/driver behind it are shared through the process-wide registry
 @st.cache_resource(show_spinner=False)
 def load_rag_chain():
     """Load the RAG chain and cache it."""
+    RAGPipeline.warm_up()
     return RAGPipeline.get_rag_chain()
 
+# Prometheus scrape endpoint, started once per process (not on every rerun)
+@st.cache_resource(show_spinner=False)
+def start_metrics():
+    metrics_config = ConfigManager().get_metrics_config()
+    if metrics_config.enabled:
+        return start_metrics_server(metrics_config.port, metrics_config.host)
+
+start_metrics()
+
 # Initialize Chat History if it doesn't exist
 if "messages" not in st.session_state:
     st.session_state["messages"] = [
@@ -61,10 +78,15 @@ if prompt := st.chat_input("Ask ragvec a question..."):
         try:
             chain = st.session_state.get("chain")
             if chain:
-                # Run the chain
-                # Note: Streamlit is sync by default, so we just invoke directly
-                response = chain.invoke(prompt)
-                
+                # Stream the chain: sources arrive first, then the answer token by token
+                response = ""
+                for kind, payload in RAGPipeline.stream_answer(chain, prompt):
+                    if kind == "sources":
+                        message_placeholder.markdown(f"📚 Found {len(payload)} source(s), generating answer...")
+                    else:
+                        response += payload
+                        message_placeholder.markdown(response + "▌")
+
                 # Display final answer
                 message_placeholder.markdown(response)
                 